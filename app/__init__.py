@@ -3,6 +3,7 @@ import os
 
 from . import controller, model, admin
 from .config import config_by_name
+from .util import jobs
 
 
 def create_flask_app(config_name):
@@ -18,5 +19,6 @@ def create_app(config_name):
     controller.init_app(app)
     model.init_app(app)
     admin.init_app(app)
+    jobs.init_app(app)
     return app
 
@@ -51,6 +51,13 @@ class Config:
 
     API_TEMPLATES_DIR = './api_templates'
 
+    PAIR_RESERVATION_SECONDS = 120
+    MAX_PAIRS_PREFETCH = 50
+
+    JOB_BACKEND = env.get('JOB_BACKEND', 'thread')
+    JOB_WORKERS = int(env.get('JOB_WORKERS', 2))
+    CELERY_BROKER_URL = f'redis://{env.get("REDIS_HOST", "localhost")}:6379/{env.get("REDIS_CELERY_DB_INDEX", 1)}'
+
 
 class DevelopmentConfig(Config):
     DEV = True
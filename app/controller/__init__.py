@@ -10,6 +10,7 @@ from . import auth_controller
 from . import criteria_controller
 from . import default_controller
 from . import event_controller
+from . import job_controller
 from . import mark_controller
 from . import pairing_mark_controller
 from . import solution_controller
@@ -61,6 +62,7 @@ def init_app(app):
     api.add_namespace(auth_controller.api)
     api.add_namespace(criteria_controller.api, path='/criteria')
     api.add_namespace(event_controller.api, path='/event')
+    api.add_namespace(job_controller.api, path='/job')
     api.add_namespace(mark_controller.api, path='/mark')
     api.add_namespace(pairing_mark_controller.api, path='/pairing_mark')
     api.add_namespace(solution_controller.api, path='/solution')
@@ -3,11 +3,15 @@ from flask_restplus import Resource
 
 from http import HTTPStatus
 
+from ..model.entity.criteria import Criteria
 from ..model.entity.event import Event
+from ..model.entity.event_result import EventResult
+from ..model.entity.job import Job
 from ..model.relation.user_event import UserEvent
 from ..model.entity.solution import Solution
-from ..util.auth import add_last_change_by_id, access_token_required, role_access_required, get_user_from_token
-from ..util.dto import EventDto
+from ..util.auth import add_last_change_by_id, access_token_required, role_access_required, get_staff_from_token, \
+    get_user_from_token
+from ..util.dto import CriteriaDto, EventDto, JobDto
 from ..util.functions import handle_error
 
 api = EventDto.api
@@ -130,3 +134,77 @@ class EventUserApi(Resource):
 
         count = len(events)
         return OrderedDict([('events', events), ('count', count)])
+
+
+@api.route('/criteria')
+@api.doc(security='access-token')
+class EventCriteriaApi(Resource):
+    @api.doc('get_event_criterias')
+    @api.expect(_item_parser, validate=True)
+    @api.response(200, 'Success', CriteriaDto.criteria_list)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    def get(self):
+        args = _item_parser.parse_args()
+        if Event.get_event_by_id(args['event_id']) is None:
+            api.abort(HTTPStatus.NOT_FOUND, f'Event with id {args["event_id"]} is not found')
+        criterias = Criteria.get_criterias_by_event(args['event_id'])
+        return OrderedDict([('criterias', criterias), ('count', len(criterias))])
+
+    @api.doc('set_event_criterias')
+    @api.expect(EventDto.event_criteria_in, validate=True)
+    @api.response(200, 'Success', CriteriaDto.criteria_list)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator'])
+    def put(self):
+        data = api.payload
+        if Event.get_event_by_id(data['event_id']) is None:
+            api.abort(HTTPStatus.NOT_FOUND, f'Event with id {data["event_id"]} is not found')
+        criterias = handle_error(Criteria.set_event_criterias(data['event_id'], data['criteria_ids']), api)
+        return OrderedDict([('criterias', criterias), ('count', len(criterias))])
+
+
+@api.route('/finalize')
+@api.doc(security='access-token')
+class EventFinalizeApi(Resource):
+    @api.doc('finalize_event')
+    @api.expect(_item_parser, validate=True)
+    @api.response(200, 'Success', JobDto.job_out)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator'])
+    def post(self):
+        args = _item_parser.parse_args()
+        staff = get_staff_from_token(api)
+        error = EventResult.check_finalizable(args['event_id'])
+        if error is not None:
+            api.abort(HTTPStatus.BAD_REQUEST, error[1])
+        params = add_last_change_by_id(dict(event_id=args['event_id']))
+        return handle_error(Job.create('finalize_event', params, staff['id']), api)
+
+
+@api.route('/results')
+@api.doc(security='access-token')
+class EventResultsApi(Resource):
+    @api.doc('get_event_results')
+    @api.expect(_item_parser, validate=True)
+    @api.response(200, 'Success', EventDto.event_results)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @api.response(404, 'Not Found')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator', 'staff'])
+    def get(self):
+        args = _item_parser.parse_args()
+        results = EventResult.get_results(args['event_id'])
+        if results is None:
+            api.abort(HTTPStatus.NOT_FOUND, f'Event with id {args["event_id"]} was not finalized')
+        return results
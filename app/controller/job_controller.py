@@ -0,0 +1,26 @@
+from flask_restplus import Resource
+
+from http import HTTPStatus
+
+from ..model.entity.job import Job
+from ..util.auth import access_token_required, role_access_required
+from ..util.dto import JobDto
+
+api = JobDto.api
+
+
+@api.route('/<int:job_id>')
+@api.doc(security='access-token')
+class JobApi(Resource):
+    @api.doc('get_job')
+    @api.response(200, 'Success', JobDto.job_out)
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @api.response(404, 'Not Found')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator', 'staff'])
+    def get(self, job_id):
+        job_dict = Job.get_job_by_id(job_id)
+        if job_dict is None:
+            return api.abort(HTTPStatus.NOT_FOUND, f'Job with id {job_id} was not found')
+        return job_dict
@@ -4,13 +4,21 @@ from flask_restplus import Resource
 from http import HTTPStatus
 
 from ..model.entity.criteria import Criteria
+from ..model.entity.event import Event
+from ..model.entity.event_result import EventResult
+from ..model.entity.job import Job
 from ..model.entity.mark import Mark
+from ..model.entity.normalized_score import NormalizedScore
+from ..model.entity.solution import Solution
 from ..util.auth import add_last_change_by_id, access_token_required, role_access_required, get_staff_from_token
-from ..util.dto import MarkDto
+from ..util.dto import JobDto, MarkDto
 from ..util.functions import handle_error
 
 api = MarkDto.api
 
+_event_parser = api.parser()
+_event_parser.add_argument('event_id', type=int, help='The event identifier.', location='args', required=True)
+
 
 @api.route('')
 @api.doc(security='access-token')
@@ -26,9 +34,16 @@ class MarkApi(Resource):
     def post(self):
         staff = get_staff_from_token(api)
         data = api.payload
-        criteria = Criteria.get_criteria_by_id(data['criteria_id'])
+        solution = Solution.get_solution_by_id(data['solution_id'])
+        if solution is None:
+            api.abort(HTTPStatus.BAD_REQUEST, f'Solution with id {data["solution_id"]} was not found')
+        error = EventResult.check_not_finalized([solution['event_id']])
+        if error is not None:
+            api.abort(HTTPStatus.BAD_REQUEST, error[1])
+        criteria = Criteria.get_event_criteria(solution['event_id'], data['criteria_id'])
         if criteria is None:
-            api.abort(HTTPStatus.BAD_REQUEST, f'Criteria with id {data["criteria_id"]} was not found')
+            api.abort(HTTPStatus.BAD_REQUEST, f'Criteria with id {data["criteria_id"]} is not used by event with id '
+                                              f'{solution["event_id"]}')
         if data['score'] > criteria['maximum'] or data['score'] < criteria['minimum']:
             api.abort(HTTPStatus.BAD_REQUEST, 'Недопустимая оценка')
         data['staff_id'] = staff['id']
@@ -40,13 +55,75 @@ class MarkApi(Resource):
     @api.response(400, 'Bad request')
     @api.response(401, 'Unauthorized')
     @api.response(403, 'Forbidden')
+    @api.response(409, 'Conflict')
     @access_token_required()
     @role_access_required(['admin', 'administrator', 'staff'])
     def put(self):
         data = api.payload
-        criteria = Criteria.get_criteria_by_id(data['criteria_id'])
-        if criteria is None:
-            api.abort(HTTPStatus.BAD_REQUEST, f'Criteria with id {data["criteria_id"]} was not found')
+        mark = Mark.get_mark_by_id(data['mark_id'])
+        if mark is None:
+            api.abort(HTTPStatus.BAD_REQUEST, f'Mark with id {data["mark_id"]} was not found')
+        error = EventResult.check_not_finalized(Solution.get_event_ids([mark['solution_id']]))
+        if error is not None:
+            api.abort(HTTPStatus.BAD_REQUEST, error[1])
+        criteria = Criteria.get_criteria_by_id(mark['criteria_id'])
         if data['score'] > criteria['maximum'] or data['score'] < criteria['minimum']:
             api.abort(HTTPStatus.BAD_REQUEST, 'Недопустимая оценка')
         return handle_error(Mark.update(add_last_change_by_id(api.payload)), api)
+
+
+@api.route('/batch')
+@api.doc(security='access-token')
+class BatchMarkApi(Resource):
+    @api.doc('upsert_marks')
+    @api.expect(MarkDto.mark_batch_in, validate=True)
+    @api.response(200, 'Success', MarkDto.mark_batch_out)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator', 'staff'])
+    def post(self):
+        marks = api.payload['marks']
+        if not marks:
+            api.abort(HTTPStatus.BAD_REQUEST, 'Empty batch')
+        error = EventResult.check_not_finalized(Solution.get_event_ids({mark['solution_id'] for mark in marks}))
+        if error is not None:
+            api.abort(HTTPStatus.BAD_REQUEST, error[1])
+        staff = get_staff_from_token(api)
+        data = add_last_change_by_id({})
+        return handle_error(Mark.upsert_batch(marks, staff['id'], data.get('last_change_by_id')), api)
+
+
+@api.route('/normalized')
+@api.doc(security='access-token')
+class NormalizedScoreApi(Resource):
+    @api.doc('get_normalized_scores')
+    @api.expect(_event_parser, validate=True)
+    @api.response(200, 'Success', MarkDto.normalized_score_list)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator', 'staff'])
+    def get(self):
+        args = _event_parser.parse_args()
+        NormalizedScore.request_refresh(args['event_id'], get_staff_from_token(api)['id'])
+        return OrderedDict([('event_id', args['event_id']),
+                            ('update_date', NormalizedScore.get_update_date(args['event_id'])),
+                            ('scores', NormalizedScore.get_scores(args['event_id']))])
+
+    @api.doc('normalize_scores')
+    @api.expect(_event_parser, validate=True)
+    @api.response(200, 'Success', JobDto.job_out)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator'])
+    def post(self):
+        args = _event_parser.parse_args()
+        staff = get_staff_from_token(api)
+        if Event.get_event_by_id(args['event_id']) is None:
+            api.abort(HTTPStatus.BAD_REQUEST, f'Event with id {args["event_id"]} was not found')
+        return handle_error(Job.create('normalize_scores', dict(event_id=args['event_id']), staff['id']), api)
@@ -1,13 +1,18 @@
 from collections import OrderedDict
+from flask import current_app
 from flask_restplus import Resource
 
 from http import HTTPStatus
 
-from ..model import Solution
+from ..model import Solution, Staff
 from ..model.entity.criteria import Criteria
+from ..model.entity.event import Event
+from ..model.entity.event_result import EventResult
+from ..model.entity.job import Job
 from ..model.entity.pairing_mark import PairingMark
+from ..model.entity.pairing_standing import PairingStanding
 from ..util.auth import add_last_change_by_id, access_token_required, role_access_required, get_staff_from_token
-from ..util.dto import PairingMarkDto
+from ..util.dto import JobDto, PairingMarkDto
 from ..util.functions import handle_error
 
 api = PairingMarkDto.api
@@ -15,6 +20,21 @@ api = PairingMarkDto.api
 _item_parser = api.parser()
 _item_parser.add_argument('event_id', type=int, help='The event identifier.', location='args', required=True)
 
+_start_parser = _item_parser.copy()
+_start_parser.add_argument('staff_ids', type=int, action='split', location='args', required=False,
+                           help='Comma separated judges to split the pairs between. All pairs go to the caller '
+                                'if omitted.')
+_start_parser.add_argument('redundancy', type=int, default=1, location='args', required=False,
+                           help='How many of the judges should judge every pair.')
+
+_conflicts_parser = _item_parser.copy()
+_conflicts_parser.add_argument('staff_id', type=int, help='The judge identifier. All judges if omitted.',
+                               location='args', required=False)
+
+_new_pair_parser = _item_parser.copy()
+_new_pair_parser.add_argument('count', type=int, help='Amount of pairs to reserve for marking.', location='args',
+                              required=False)
+
 
 @api.route('')
 @api.doc(security='access-token')
@@ -30,11 +50,15 @@ class MarkApi(Resource):
     def post(self):
         staff = get_staff_from_token(api)
         data = api.payload
-        criteria = Criteria.get_criteria_by_id(data['criteria_id'])
+        criteria = Criteria.get_event_criteria(data['event_id'], data['criteria_id'])
         if criteria is None:
-            api.abort(HTTPStatus.BAD_REQUEST, f'Criteria with id {data["criteria_id"]} was not found')
+            api.abort(HTTPStatus.BAD_REQUEST,
+                      f'Criteria with id {data["criteria_id"]} is not used by event with id {data["event_id"]}')
         if data['score'] > 2 or data['score'] < 0:
             api.abort(HTTPStatus.BAD_REQUEST, 'Not acceptable score')
+        error = EventResult.check_not_finalized([data['event_id']])
+        if error is not None:
+            api.abort(HTTPStatus.BAD_REQUEST, error[1])
         data['staff_id'] = staff['id']
         return handle_error(PairingMark.create(add_last_change_by_id(data)), api)
 
@@ -44,6 +68,7 @@ class MarkApi(Resource):
     @api.response(400, 'Bad request')
     @api.response(401, 'Unauthorized')
     @api.response(403, 'Forbidden')
+    @api.response(409, 'Conflict')
     @access_token_required()
     @role_access_required(['admin', 'administrator', 'staff'])
     def put(self):
@@ -52,15 +77,104 @@ class MarkApi(Resource):
         data['staff_id'] = staff['id']
         if data['score'] > 2 or data['score'] < 0:
             api.abort(HTTPStatus.BAD_REQUEST, 'Not acceptable score')
+        error = EventResult.check_not_finalized([data['event_id']])
+        if error is not None:
+            api.abort(HTTPStatus.BAD_REQUEST, error[1])
         mark, mark_list = PairingMark.update_tree(add_last_change_by_id(data))
-        return OrderedDict([('updated_mark', mark), ('automatically_updated_marks', mark_list)])
+        return OrderedDict([('updated_mark', handle_error(mark, api)), ('automatically_updated_marks', mark_list)])
+
+
+@api.route('/batch')
+@api.doc(security='access-token')
+class BatchMarkApi(Resource):
+    @api.doc('update_marks')
+    @api.expect(PairingMarkDto.pairing_mark_batch_in, validate=True)
+    @api.response(200, 'Success', PairingMarkDto.pairing_batch_update_out)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @api.response(409, 'Conflict')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator', 'staff'])
+    def put(self):
+        marks = api.payload['marks']
+        if not marks:
+            api.abort(HTTPStatus.BAD_REQUEST, 'Empty batch')
+        for mark in marks:
+            if mark['score'] > 2 or mark['score'] < 0:
+                api.abort(HTTPStatus.BAD_REQUEST, f'Not acceptable score for pair mark {mark["pairing_mark_id"]}')
+        error = EventResult.check_not_finalized([api.payload['event_id']])
+        if error is not None:
+            api.abort(HTTPStatus.BAD_REQUEST, error[1])
+        data = add_last_change_by_id({})
+        return handle_error(PairingMark.update_batch(marks, data.get('last_change_by_id'), api.payload['event_id']),
+                            api)
+
+
+@api.route('/ranking')
+@api.doc(security='access-token')
+class RankingApi(Resource):
+    @api.doc('event ranking')
+    @api.expect(_item_parser, validate=True)
+    @api.response(200, 'Success')
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator', 'staff'])
+    def get(self):
+        args = _item_parser.parse_args()
+        ranking = EventResult.get_section(args['event_id'], EventResult.RANKING)
+        if ranking is not None:
+            return OrderedDict([('event_id', args['event_id']), ('ranking', ranking)])
+        return handle_error(PairingMark.get_ranking(args['event_id']), api)
+
+
+@api.route('/standings')
+@api.doc(security='access-token')
+class StandingsApi(Resource):
+    @api.doc('event standings')
+    @api.expect(_item_parser, validate=True)
+    @api.response(200, 'Success', PairingMarkDto.pairing_standing_list)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator', 'staff'])
+    def get(self):
+        args = _item_parser.parse_args()
+        standings = EventResult.get_section(args['event_id'], EventResult.STANDINGS)
+        if standings is not None:
+            return OrderedDict([('event_id', args['event_id']), ('standings', standings)])
+        if Event.get_event_by_id(args['event_id']) is None:
+            api.abort(HTTPStatus.BAD_REQUEST, f'Event with id {args["event_id"]} was not found')
+        return OrderedDict([('event_id', args['event_id']),
+                            ('standings', PairingStanding.get_standings(args['event_id']))])
+
+
+@api.route('/conflicts')
+@api.doc(security='access-token')
+class ConflictsApi(Resource):
+    @api.doc('judgment conflicts')
+    @api.expect(_conflicts_parser, validate=True)
+    @api.response(200, 'Success', PairingMarkDto.pairing_conflict_list)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator'])
+    def get(self):
+        args = _conflicts_parser.parse_args()
+        if Event.get_event_by_id(args['event_id']) is None:
+            api.abort(HTTPStatus.BAD_REQUEST, f'Event with id {args["event_id"]} was not found')
+        return PairingMark.get_conflicts(args['event_id'], args.get('staff_id'))
 
 
 @api.route('/new_pair')
 @api.doc(security='access-token')
 class NewPairMarkApi(Resource):
     @api.doc('start marking')
-    @api.expect(_item_parser, validate=True)
+    @api.expect(_new_pair_parser, validate=True)
     @api.response(200, 'Success')
     @api.response(400, 'Bad request')
     @api.response(401, 'Unauthorized')
@@ -68,24 +182,82 @@ class NewPairMarkApi(Resource):
     @access_token_required()
     @role_access_required(['admin', 'administrator', 'staff'])
     def get(self):
-        args = _item_parser.parse_args()
+        args = _new_pair_parser.parse_args()
         staff = get_staff_from_token(api)
-        return handle_error(PairingMark.get_pair_for_marking(staff['id'], args['event_id']))
+        if args.get('count') is None:
+            return handle_error(PairingMark.get_pair_for_marking(staff['id'], args['event_id']))
+        if args['count'] < 1:
+            api.abort(HTTPStatus.BAD_REQUEST, 'Not acceptable count')
+        count = min(args['count'], current_app.config['MAX_PAIRS_PREFETCH'])
+        return handle_error(PairingMark.get_pairs_for_marking(staff['id'], args['event_id'], count))
 
 
 @api.route('/start')
 @api.doc(security='access-token')
 class StartMarkApi(Resource):
     @api.doc('start marking')
-    @api.expect(_item_parser, validate=True)
-    @api.response(200, 'Success')
+    @api.expect(_start_parser, validate=True)
+    @api.response(200, 'Success', JobDto.job_out)
     @api.response(400, 'Bad request')
     @api.response(401, 'Unauthorized')
     @api.response(403, 'Forbidden')
     @access_token_required()
     @role_access_required(['admin', 'administrator', 'staff'])
+    def post(self):
+        args = _start_parser.parse_args()
+        staff = get_staff_from_token(api)
+        if not args.get('staff_ids'):
+            if Event.get_event_by_id(args['event_id']) is None:
+                api.abort(HTTPStatus.BAD_REQUEST, f'Event with id {args["event_id"]} was not found')
+            return handle_error(Job.create('create_pairs', dict(event_id=args['event_id'], staff_id=staff['id']),
+                                           staff['id']), api)
+
+        staff_instance = Staff.get_staff_instance_by_id(staff['id'])
+        if not staff_instance.has_role('admin') and not staff_instance.has_role('administrator'):
+            api.abort(HTTPStatus.FORBIDDEN, 'admin, administrator access required')
+        for staff_id in args['staff_ids']:
+            if Staff.get_staff_by_id(staff_id) is None:
+                api.abort(HTTPStatus.BAD_REQUEST, f'Staff with id {staff_id} was not found')
+        error = Solution.check_distribution(args['event_id'], args['staff_ids'], args['redundancy'])
+        if error is not None:
+            return handle_error(error, api)
+        params = dict(event_id=args['event_id'], staff_ids=args['staff_ids'], redundancy=args['redundancy'])
+        return handle_error(Job.create('create_pairs', params, staff['id']), api)
+
+
+@api.route('/event')
+@api.doc(security='access-token')
+class EventMarksApi(Resource):
+    @api.doc('delete event marks')
+    @api.expect(_item_parser, validate=True)
+    @api.response(200, 'Success', JobDto.job_out)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator'])
+    def delete(self):
+        args = _item_parser.parse_args()
+        staff = get_staff_from_token(api)
+        if Event.get_event_by_id(args['event_id']) is None:
+            api.abort(HTTPStatus.BAD_REQUEST, f'Event with id {args["event_id"]} was not found')
+        return handle_error(Job.create('delete_event_pairs', dict(event_id=args['event_id']), staff['id']), api)
+
+
+@api.route('/rebuild')
+@api.doc(security='access-token')
+class RebuildMarksApi(Resource):
+    @api.doc('rebuild standings')
+    @api.expect(_item_parser, validate=True)
+    @api.response(200, 'Success', JobDto.job_out)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator'])
     def post(self):
         args = _item_parser.parse_args()
         staff = get_staff_from_token(api)
-        handle_error(Solution.create_all_pairs(args['event_id'], staff['id']))
-        return 'Success'
+        if Event.get_event_by_id(args['event_id']) is None:
+            api.abort(HTTPStatus.BAD_REQUEST, f'Event with id {args["event_id"]} was not found')
+        return handle_error(Job.create('rebuild_standings', dict(event_id=args['event_id']), staff['id']), api)
@@ -1,9 +1,12 @@
 from collections import OrderedDict
-from flask_restplus import Resource
+from flask_restplus import Resource, inputs
 
 from http import HTTPStatus
 
+from ..model.entity.event_result import EventResult
+from ..model.entity.normalized_score import NormalizedScore
 from ..model.entity.solution import Solution
+from ..model.entity.solution_rating import SolutionRating
 from ..util.auth import add_last_change_by_id, access_token_required, role_access_required, get_user_from_token
 from ..util.dto import SolutionDto
 from ..util.functions import handle_error
@@ -17,6 +20,25 @@ _item_parser.add_argument('solution_id', type=int, help='Solution unique identif
 _event_parser = api.parser()
 _event_parser.add_argument('event_id', type=int, help='The event identifier.', location='args', required=True)
 
+_solutions_parser = _event_parser.copy()
+_aggregate_help = 'Return scores aggregated per criteria instead of marks'
+_item_parser.add_argument('aggregate', type=inputs.boolean, help=_aggregate_help, location='args', default=False)
+_solutions_parser.add_argument('aggregate', type=inputs.boolean, help=_aggregate_help, location='args', default=False)
+_normalized_help = 'Aggregate precomputed scores normalized per staff and criteria instead of raw ones, implies aggregate'
+_item_parser.add_argument('normalized', type=str, choices=NormalizedScore.NORMALIZATIONS, help=_normalized_help,
+                          location='args')
+_solutions_parser.add_argument('normalized', type=str, choices=NormalizedScore.NORMALIZATIONS,
+                               help=_normalized_help, location='args')
+
+
+def _get_snapshot(event_id, args):
+    """
+    Returns solutions of the event frozen when it was finalized in the requested form or None if it was not.
+    """
+    if args['aggregate'] or args['normalized']:
+        return EventResult.get_aggregates(event_id, args['normalized'])
+    return EventResult.get_section(event_id, EventResult.SOLUTIONS)
+
 
 @api.route('')
 @api.doc(security='access-token')
@@ -50,6 +72,14 @@ class SolutionApi(Resource):
         solution = Solution.get_solution_by_id(args.get('solution_id'))
         if solution is None:
             api.abort(HTTPStatus.NOT_FOUND, f'Solution with id {args.get("solution_id")} was not found')
+        frozen = next((item for item in _get_snapshot(solution['event_id'], args) or []
+                       if item['solution_id'] == solution['solution_id']), None)
+        if frozen is not None:
+            return frozen
+        if args['normalized']:
+            NormalizedScore.request_refresh(solution['event_id'])
+        if args['aggregate'] or args['normalized']:
+            return Solution.add_score_aggregates([solution], args['normalized'])[0]
         solution = get_items_with_relations([solution], Solution, None, ['marks', 'pairing_marks'])[0]
         return solution
 
@@ -68,7 +98,7 @@ class SolutionApi(Resource):
 @api.doc(security='access-token')
 class SolutionEventApi(Resource):
     @api.doc('get_solutions_by_id')
-    @api.expect(_event_parser, validate=True)
+    @api.expect(_solutions_parser, validate=True)
     @api.response(200, 'Success', SolutionDto.solution_list)
     @api.response(400, 'Bad request')
     @api.response(401, 'Unauthorized')
@@ -76,8 +106,36 @@ class SolutionEventApi(Resource):
     @access_token_required()
     @role_access_required(['admin', 'administrator', 'staff'])
     def get(self):
-        args = _event_parser.parse_args()
+        args = _solutions_parser.parse_args()
+        solutions = _get_snapshot(args['event_id'], args)
+        if solutions is not None:
+            return OrderedDict([('solutions', solutions), ('count', len(solutions))])
+        if args['normalized']:
+            NormalizedScore.request_refresh(args['event_id'])
+        if args['aggregate'] or args['normalized']:
+            solutions = Solution.add_score_aggregates(Solution.get_solutions_by_event(args['event_id']),
+                                                      args['normalized'])
+            return OrderedDict([('solutions', solutions), ('count', len(solutions))])
         solutions = Solution.get_solutions_by_event(args.get('event_id'))
         count = len(solutions)
         solutions = get_items_with_relations(solutions, Solution, None, ['marks', 'pairing_marks'])
         return OrderedDict([('solutions', solutions), ('count', count)])
+
+
+@api.route('/ratings')
+@api.doc(security='access-token')
+class SolutionRatingsApi(Resource):
+    @api.doc('get_solution_ratings')
+    @api.expect(_event_parser, validate=True)
+    @api.response(200, 'Success', SolutionDto.solution_rating_list)
+    @api.response(400, 'Bad request')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @access_token_required()
+    @role_access_required(['admin', 'administrator', 'staff'])
+    def get(self):
+        args = _event_parser.parse_args()
+        ratings = EventResult.get_section(args['event_id'], EventResult.RATINGS)
+        if ratings is None:
+            ratings = SolutionRating.get_ratings(args['event_id'])
+        return OrderedDict([('event_id', args['event_id']), ('ratings', ratings)])
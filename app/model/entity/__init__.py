@@ -2,13 +2,19 @@ from .api_key import ApiKey
 from .api_key_role import ApiKeyRole
 from .criteria import Criteria
 from .event import Event
+from .event_result import EventResult
+from .job import Job
 from .mark import Mark
+from .normalized_score import NormalizedScore
 from .person import Person
 from .pairing_mark import PairingMark
+from .pairing_progress import PairingProgress
+from .pairing_standing import PairingStanding
 from .release import Release
 from .role import Role
 from .role_staff import role_staff_table
 from .solution import Solution
+from .solution_rating import SolutionRating
 from .staff import Staff
 from .user import User
 
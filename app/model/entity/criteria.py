@@ -1,7 +1,9 @@
-from sqlalchemy import Column, DateTime, Integer, String
+from flask import g, has_app_context
+from sqlalchemy import Column, DateTime, Float, Integer, String
 
-from app.model.db import seq
+from app.model.db import db, seq
 from .entity_base import EntityBase
+from ..relation.event_criteria import EventCriteria
 
 class Criteria(EntityBase):
     __tablename__ = 'criteria'
@@ -11,17 +13,20 @@ class Criteria(EntityBase):
     description = Column(String, nullable=True)
     minimum = Column(Integer, nullable=False)
     maximum = Column(Integer, nullable=False)
+    weight = Column(Float, nullable=False, default=1, server_default='1')
 
     create_date = Column(DateTime, default=EntityBase.now)
     update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
     last_change_by_id = Column(Integer)
 
-    serialize_items_list = ['criteria_id', 'name', 'description', 'minimum', 'maximum',
+    serialize_items_list = ['criteria_id', 'name', 'description', 'minimum', 'maximum', 'weight',
                             'create_date', 'update_date', 'last_change_by_id']
 
-    update_fields = ['name', 'description', 'minimum', 'maximum', 'last_change_by_id']
+    update_fields = ['name', 'description', 'minimum', 'maximum', 'weight', 'last_change_by_id']
 
-    update_simple_fields = ['name', 'description', 'minimum', 'maximum', 'last_change_by_id']
+    update_simple_fields = ['name', 'description', 'minimum', 'maximum', 'weight', 'last_change_by_id']
+
+    delete_relations_funcs = [EventCriteria.delete_relations_by_criteria]
 
     @classmethod
     def get_criteria_by_id(cls, criteria_id):
@@ -35,10 +40,51 @@ class Criteria(EntityBase):
 
     get_items = get_criterias
 
+    @classmethod
+    def get_criterias_by_event(cls, event_id):
+        """
+        Returns criteria the event is evaluated by, they are loaded once per request.
+        """
+        cache = g.setdefault('event_criterias', {}) if has_app_context() else {}
+        if event_id not in cache:
+            cache[event_id] = [criteria.to_dict() for criteria in cls.query.join(
+                EventCriteria, EventCriteria.criteria_id == cls.criteria_id
+            ).filter(EventCriteria.event_id == event_id).order_by(cls.criteria_id).all()]
+        return cache[event_id]
+
+    @classmethod
+    def get_criteria_ids_by_event(cls, event_id):
+        return [criteria['criteria_id'] for criteria in cls.get_criterias_by_event(event_id)]
+
+    @classmethod
+    def get_event_criteria(cls, event_id, criteria_id):
+        return next((criteria for criteria in cls.get_criterias_by_event(event_id)
+                     if criteria['criteria_id'] == criteria_id), None)
+
+    @classmethod
+    def check_ids(cls, criteria_ids):
+        if not criteria_ids:
+            return None, 'Event must be evaluated by at least one criteria'
+        unknown_ids = set(criteria_ids).difference(
+            criteria_id for criteria_id, in db.session.query(cls.criteria_id).filter(cls.criteria_id.in_(criteria_ids))
+        )
+        if unknown_ids:
+            return None, f'Criteria with ids {sorted(unknown_ids)} were not found'
+        return None
+
+    @classmethod
+    def set_event_criterias(cls, event_id, criteria_ids):
+        error = cls.check_ids(criteria_ids)
+        if error is not None:
+            return error
+        EventCriteria.update_by_event(event_id, cls.get_criteria_ids_by_event(event_id), criteria_ids)
+        cls._delete_from_cache(None)
+        return cls.get_criterias_by_event(event_id)
+
     @classmethod
     def create(cls, data):
         criteria = cls(name=data['name'], description=data['description'], minimum=data['minimum'],
-                       maximum=data['maximum'])
+                       maximum=data['maximum'], weight=data.get('weight', 1))
 
         criteria.add()
         criteria_dict = criteria.to_dict()
@@ -58,6 +104,7 @@ class Criteria(EntityBase):
         criteria = cls.from_dict(criteria_dict)
         criteria._update_simple_fields(data)
         criteria_dict = criteria.to_dict()
+        cls._delete_from_cache(criteria_dict)
 
         return criteria_dict
 
@@ -65,6 +112,11 @@ class Criteria(EntityBase):
     def delete(cls, criteria_id):
         criteria_dict = cls.get_criteria_by_id(criteria_id)
         if criteria_dict:
-            cls._delete(criteria_dict)
+            criteria_dict['deleted'] = cls._delete_cascade(criteria_dict)
             return criteria_dict
         return None, f'Criteria with id {criteria_id} was not found'
+
+    @classmethod
+    def _delete_from_cache(cls, item):
+        if has_app_context():
+            g.pop('event_criterias', None)
@@ -4,6 +4,7 @@ from flask import current_app
 from sqlalchemy.inspection import inspect
 
 from app.model.base import Base
+from app.model.db import db
 from ...util import any_in
 
 
@@ -62,6 +63,17 @@ class EntityBase(Base):
         self._update_fields(self.update_simple_fields, data)
         self.add()
 
+    @classmethod
+    def _update_versioned(cls, condition, version, data):
+        """
+        Updates simple fields of the row matching the condition inside the current transaction only if it still has
+        the version it was read with. Returns False when someone else changed the row meanwhile.
+        """
+        values = {field: data[field] for field in cls.update_simple_fields if field in data}
+        return cls.query.filter(condition & (cls.version == version)).update(
+            dict(values, version=cls.version + 1), synchronize_session=False
+        ) == 1
+
     def _update_relations(self, data):
         for key, func in self.update_relations_map.items():
             if key in data:
@@ -76,6 +88,24 @@ class EntityBase(Base):
         item.delete_self()
         cls._delete_from_cache(item_dict)
 
+    @classmethod
+    def _delete_cascade(cls, item_dict, delete_relations_funcs=None):
+        """
+        Deletes the item and its relations in one transaction and returns deleted rows counts by table.
+        Relation delete functions run set-based deletes without committing and return such counts too.
+        """
+        item_id = item_dict[cls.get_standard_id()]
+        deleted = OrderedDict()
+        with db.auto_commit():
+            for delete_func in cls.delete_relations_funcs if delete_relations_funcs is None else delete_relations_funcs:
+                for table, count in delete_func(item_id).items():
+                    deleted[table] = deleted.get(table, 0) + count
+            deleted[cls.__tablename__] = cls.query.filter(
+                getattr(cls, cls.get_standard_id()) == item_id
+            ).delete(synchronize_session=False)
+        cls._delete_from_cache(item_dict)
+        return deleted
+
     @classmethod
     def _delete_from_cache(cls, item):
         pass
@@ -1,26 +1,37 @@
 from sqlalchemy import Column, DateTime, Integer, String
 
 from app.model.db import seq
+from .criteria import Criteria
 from .entity_base import EntityBase
+from ..relation.event_criteria import EventCriteria
 
 
 class Event(EntityBase):
     __tablename__ = 'Event'
 
+    SIMPLE_EVALUATION = 'simple'
+    BINARY_INSERTION_EVALUATION = 'binary_insertion'
+    SWISS_EVALUATION = 'swiss'
+
+    evaluation_methods = [SIMPLE_EVALUATION, BINARY_INSERTION_EVALUATION, SWISS_EVALUATION]
+
     event_id = Column(Integer, seq, primary_key=True)
     name = Column(String, nullable=False)
     date_start = Column(DateTime, nullable=False)
     date_end = Column(DateTime, nullable=False)
-    evaluation_method = Column(String, default='simple')
+    evaluation_method = Column(String, default=SIMPLE_EVALUATION)
+    swiss_rounds = Column(Integer, nullable=True)
+    pair_redundancy = Column(Integer, nullable=True)
 
     create_date = Column(DateTime, default=EntityBase.now)
     update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
     last_change_by_id = Column(Integer)
 
-    serialize_items_list = ['event_id', 'name', 'date_start', 'date_end', 'evaluation_method', 'create_date',
-                            'update_date', 'last_change_by_id']
-    update_fields = ['name', 'date_start', 'date_end', 'evaluation_method', 'last_change_by_id']
-    update_simple_fields = ['name', 'date_start', 'date_end', 'evaluation_method', 'last_change_by_id']
+    serialize_items_list = ['event_id', 'name', 'date_start', 'date_end', 'evaluation_method', 'swiss_rounds',
+                            'pair_redundancy', 'create_date', 'update_date', 'last_change_by_id']
+    update_fields = ['name', 'date_start', 'date_end', 'evaluation_method', 'swiss_rounds', 'last_change_by_id']
+    update_simple_fields = ['name', 'date_start', 'date_end', 'evaluation_method', 'swiss_rounds',
+                            'last_change_by_id']
 
     @classmethod
     def get_event_by_id(cls, event_id):
@@ -36,11 +47,29 @@ class Event(EntityBase):
 
     @classmethod
     def create(cls, data):
+        evaluation_method = data.get('evaluation_method') or cls.SIMPLE_EVALUATION
+        if evaluation_method not in cls.evaluation_methods:
+            return None, f'Unknown evaluation method {evaluation_method}'
+
+        if data.get('swiss_rounds') is not None and data['swiss_rounds'] < 1:
+            return None, 'Amount of swiss rounds must be positive'
+
+        # events are evaluated by every criteria existing at their creation unless told otherwise
+        criteria_ids = data.get('criteria_ids')
+        if criteria_ids is None:
+            criteria_ids = [criteria['criteria_id'] for criteria in Criteria.get_criterias()]
+        else:
+            error = Criteria.check_ids(criteria_ids)
+            if error is not None:
+                return error
+
         event = cls(name=data['name'], date_start=data['date_start'], date_end=data['date_end'],
-                    evaluation_method=data['evaluation_method'])
+                    evaluation_method=evaluation_method, swiss_rounds=data.get('swiss_rounds'))
         event.add()
         event_dict = event.to_dict()
 
+        EventCriteria.update_by_event(event_dict['event_id'], [], criteria_ids)
+
         return event_dict
 
     @classmethod
@@ -53,6 +82,17 @@ class Event(EntityBase):
         if not cls._is_update_fields(data):
             return event_dict
 
+        if data.get('evaluation_method') and data['evaluation_method'] not in cls.evaluation_methods:
+            return None, f'Unknown evaluation method {data["evaluation_method"]}'
+
+        if data.get('swiss_rounds') is not None and data['swiss_rounds'] < 1:
+            return None, 'Amount of swiss rounds must be positive'
+
+        if data.get('criteria_ids') is not None:
+            criterias = Criteria.set_event_criterias(data['event_id'], data['criteria_ids'])
+            if isinstance(criterias, tuple):
+                return criterias
+
         event = cls.from_dict(event_dict)
         event._update_simple_fields(data)
         event_dict = event.to_dict()
@@ -61,8 +101,15 @@ class Event(EntityBase):
 
     @classmethod
     def delete(cls, event_id):
+        from .event_result import EventResult
+        from .pairing_mark import PairingMark
+        from .solution import Solution
+
         event_dict = Event.get_event_by_id(event_id)
         if event_dict:
-            cls._delete(event_dict)
+            event_dict['deleted'] = cls._delete_cascade(event_dict, [EventResult.delete_by_event,
+                                                                     Solution.delete_by_event,
+                                                                     EventCriteria.delete_relations_by_event])
+            PairingMark.drop_partition(event_id)
             return event_dict
         return None, f'Event with id {event_id} was not found'
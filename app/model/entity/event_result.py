@@ -0,0 +1,151 @@
+from collections import OrderedDict
+
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, JSON, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.model.db import db
+from .entity_base import EntityBase
+from .event import Event
+from .mark import Mark
+from .normalized_score import NormalizedScore
+from .pairing_mark import PairingMark
+from .pairing_standing import PairingStanding
+from .solution import Solution
+from .solution_rating import SolutionRating
+from ...util import get_items_with_relations
+
+
+class EventResult(EntityBase):
+    """
+    Results of a finished event frozen into one precomputed document per section.
+    """
+    __tablename__ = 'event_result'
+
+    SOLUTIONS = 'solutions'
+    RANKING = 'ranking'
+    STANDINGS = 'standings'
+    RATINGS = 'ratings'
+    CRITERIA = 'criteria'
+    MARK_COUNTS = 'mark_counts'
+    AGGREGATES = 'aggregates'
+
+    RAW = 'raw'
+
+    event_id = Column(Integer, ForeignKey('Event.event_id'), primary_key=True)
+    section = Column(String, primary_key=True)
+    document = Column(JSON, nullable=False)
+
+    create_date = Column(DateTime, default=EntityBase.now)
+    last_change_by_id = Column(Integer)
+
+    serialize_items_list = ['event_id', 'section', 'document', 'create_date', 'last_change_by_id']
+
+    @classmethod
+    def get_section(cls, event_id, section):
+        """
+        Returns the section document of a finalized event or None if the event was not finalized.
+        """
+        return db.session.query(cls.document).filter_by(event_id=event_id, section=section).scalar()
+
+    @classmethod
+    def get_aggregates(cls, event_id, normalization=None):
+        """
+        Returns solutions with score aggregates frozen for the normalization or None if the event was not finalized.
+        """
+        aggregates = cls.get_section(event_id, cls.AGGREGATES)
+        return None if aggregates is None else aggregates[normalization or cls.RAW]
+
+    @classmethod
+    def check_not_finalized(cls, event_ids):
+        """
+        Returns an error if any of the events was finalized, marks of a finalized event can not change anymore.
+        """
+        event_id = db.session.query(cls.event_id).filter(cls.event_id.in_(list(event_ids))).order_by(
+            cls.event_id
+        ).limit(1).scalar()
+        if event_id is not None:
+            return None, f'Event with id {event_id} was finalized, its marks can not be changed'
+        return None
+
+    @classmethod
+    def get_results(cls, event_id):
+        results = cls.query.filter_by(event_id=event_id).all()
+        if not results:
+            return None
+        return OrderedDict([('event_id', event_id), ('create_date', results[0].to_dict()['create_date']),
+                            *[(result.section, result.document) for result in results]])
+
+    @classmethod
+    def check_finalizable(cls, event_id):
+        event = Event.query.filter_by(event_id=event_id).first()
+        if event is None:
+            return None, f'Event with id {event_id} was not found'
+        if event.date_end > cls.now():
+            return None, f'Event with id {event_id} has not ended yet'
+        return None
+
+    @classmethod
+    def _criteria_aggregates(cls, event_id):
+        aggregates = db.session.query(
+            Mark.criteria_id, Mark.solution_id, func.count(), func.avg(Mark.score), func.min(Mark.score),
+            func.max(Mark.score)
+        ).join(Solution, Solution.solution_id == Mark.solution_id).filter(Solution.event_id == event_id).group_by(
+            Mark.criteria_id, Mark.solution_id
+        ).order_by(Mark.criteria_id, Mark.solution_id)
+        return [OrderedDict([('criteria_id', criteria_id), ('solution_id', solution_id), ('marks', marks),
+                             ('average', float(average)), ('minimum', minimum), ('maximum', maximum)])
+                for criteria_id, solution_id, marks, average, minimum, maximum in aggregates]
+
+    @classmethod
+    def _mark_counts(cls, event_id):
+        marks = db.session.query(func.count(Mark.mark_id)).join(
+            Solution, Solution.solution_id == Mark.solution_id
+        ).filter(Solution.event_id == event_id).scalar()
+        pairing_marks, judged_pairing_marks = db.session.query(
+            func.count(), func.count().filter(PairingMark.score != -1)
+        ).filter(PairingMark.event_id == event_id).one()
+        return OrderedDict([('marks', marks), ('pairing_marks', pairing_marks),
+                            ('judged_pairing_marks', judged_pairing_marks)])
+
+    @classmethod
+    def finalize(cls, event_id, last_change_by_id):
+        """
+        Computes every results section of a finished event and replaces the stored snapshot with them.
+        """
+        error = cls.check_finalizable(event_id)
+        if error is not None:
+            return error
+
+        NormalizedScore.rebuild(event_id)
+        solutions = Solution.get_solutions_by_event(event_id)
+        sections = OrderedDict([
+            (cls.SOLUTIONS, get_items_with_relations(solutions, Solution, None, ['marks', 'pairing_marks'])),
+            (cls.RANKING, PairingMark.get_ranking(event_id)['ranking']),
+            (cls.STANDINGS, PairingStanding.get_standings(event_id)),
+            (cls.RATINGS, SolutionRating.get_ratings(event_id)),
+            (cls.CRITERIA, cls._criteria_aggregates(event_id)),
+            (cls.MARK_COUNTS, cls._mark_counts(event_id)),
+            (cls.AGGREGATES, OrderedDict([(normalization or cls.RAW, Solution.add_score_aggregates(solutions,
+                                                                                                    normalization))
+                                          for normalization in [None, *NormalizedScore.NORMALIZATIONS]]))
+        ])
+
+        now = cls.now()
+        statement = insert(cls.__table__).values([
+            dict(event_id=event_id, section=section, document=document, create_date=now,
+                 last_change_by_id=last_change_by_id)
+            for section, document in sections.items()
+        ])
+        with db.auto_commit():
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=['event_id', 'section'],
+                set_={'document': statement.excluded.document, 'create_date': statement.excluded.create_date,
+                      'last_change_by_id': statement.excluded.last_change_by_id}
+            ))
+        PairingMark.evict_caches(event_id)
+        return OrderedDict([('event_id', event_id), ('sections', list(sections)), ('solutions', len(solutions))])
+
+    @classmethod
+    def delete_by_event(cls, event_id):
+        deleted = cls.query.filter_by(event_id=event_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import Column, DateTime, Float, Integer, String, ForeignKey, JSON
+
+from app.model.db import db, seq
+from .criteria import Criteria
+from .entity_base import EntityBase
+from .event import Event
+from .event_result import EventResult
+from .normalized_score import NormalizedScore
+from .pairing_mark import PairingMark
+from .pairing_progress import PairingProgress
+from .pairing_standing import PairingStanding
+from .solution import Solution
+from .solution_rating import SolutionRating
+from ...util.jobs import submit_job
+
+
+def _create_pairs(params, report):
+    event = Event.get_event_by_id(params['event_id'])
+    if event is not None and event['evaluation_method'] == Event.SWISS_EVALUATION:
+        result = Solution.create_swiss_round(params['event_id'], params.get('staff_ids') or [params['staff_id']],
+                                             params.get('redundancy', 1))
+        if isinstance(result, tuple):
+            raise ValueError(result[1])
+        return {'created_pairs': result}
+
+    criteria_ids = Criteria.get_criteria_ids_by_event(params['event_id'])
+    created = 0
+    for i, criteria_id in enumerate(criteria_ids):
+        if params.get('staff_ids'):
+            result = Solution.distribute_pairs(params['event_id'], params['staff_ids'], params['redundancy'],
+                                               criteria_id)
+            if isinstance(result, tuple):
+                raise ValueError(result[1])
+            created += result
+        else:
+            created += Solution.create_all_pairs(params['event_id'], params['staff_id'], criteria_id)
+        report(i + 1, len(criteria_ids))
+    return {'created_pairs': created}
+
+
+def _delete_event_pairs(params, report):
+    with db.auto_commit():
+        deleted = PairingMark.delete_by_event(params['event_id'])
+    return {'deleted_pairs': deleted[PairingMark.__tablename__]}
+
+
+def _rebuild_standings(params, report):
+    event_ids = [params['event_id']] if params.get('event_id') else [event.event_id for event in Event.query]
+    out_of_sync = 0
+    for i, event_id in enumerate(event_ids):
+        PairingProgress.rebuild(event_id)
+        out_of_sync += PairingStanding.rebuild(event_id)
+        SolutionRating.rebuild(event_id)
+        report(i + 1, len(event_ids))
+    return {'rebuilt_events': len(event_ids), 'out_of_sync_standings': out_of_sync}
+
+
+def _normalize_scores(params, report):
+    return {'normalized_scores': NormalizedScore.rebuild(params['event_id'])}
+
+
+def _finalize_event(params, report):
+    result = EventResult.finalize(params['event_id'], params.get('last_change_by_id'))
+    if isinstance(result, tuple):
+        raise ValueError(result[1])
+    return result
+
+
+class Job(EntityBase):
+    __tablename__ = 'job'
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    job_id = Column(Integer, seq, primary_key=True)
+    name = Column(String, nullable=False)
+    params = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default=PENDING)
+    progress = Column(Float, nullable=False, default=0)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    staff_id = Column(Integer, ForeignKey('staff.id'))
+
+    create_date = Column(DateTime, default=EntityBase.now)
+    update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
+    finish_date = Column(DateTime, nullable=True)
+
+    serialize_items_list = ['job_id', 'name', 'params', 'status', 'progress', 'result', 'error', 'staff_id',
+                            'create_date', 'update_date', 'finish_date']
+
+    tasks = {
+        'create_pairs': _create_pairs,
+        'delete_event_pairs': _delete_event_pairs,
+        'rebuild_standings': _rebuild_standings,
+        'finalize_event': _finalize_event,
+        'normalize_scores': _normalize_scores
+    }
+
+    @classmethod
+    def get_job_by_id(cls, job_id):
+        return cls.dict_item(cls.query.filter_by(job_id=job_id).first())
+
+    get_item_by_id = get_job_by_id
+
+    @classmethod
+    def delete_by_staff(cls, staff_id):
+        deleted = cls.query.filter_by(staff_id=staff_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
+
+    @classmethod
+    def create(cls, name, params, staff_id):
+        if name not in cls.tasks:
+            return None, f'Job {name} is not supported'
+
+        job = cls(name=name, params=params, staff_id=staff_id, status=cls.PENDING, progress=0)
+        job.add()
+        job_dict = job.to_dict()
+        submit_job(job_dict['job_id'])
+
+        return job_dict
+
+    @classmethod
+    def create_once(cls, name, params, staff_id):
+        """
+        Creates the job unless the same one is still waiting to run, changes made meanwhile are picked up by it.
+        """
+        pending = cls.query.filter_by(name=name, status=cls.PENDING).all()
+        job = next((job for job in pending if job.params == params), None)
+        if job is not None:
+            return job.to_dict()
+        return cls.create(name, params, staff_id)
+
+    @classmethod
+    def _update_job(cls, job_id, **values):
+        with db.auto_commit():
+            cls.query.filter_by(job_id=job_id).update(dict(values, update_date=cls.now()))
+
+    @classmethod
+    def run(cls, job_id):
+        job_dict = cls.get_job_by_id(job_id)
+        if job_dict is None or job_dict['status'] != cls.PENDING:
+            return
+        cls._update_job(job_id, status=cls.RUNNING)
+
+        def report(done, total):
+            cls._update_job(job_id, progress=done / total if total else 1)
+
+        try:
+            result = cls.tasks[job_dict['name']](job_dict['params'], report)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f'Job {job_id} failed')
+            cls._update_job(job_id, status=cls.FAILED, error=str(e), finish_date=cls.now())
+            return
+        cls._update_job(job_id, status=cls.DONE, progress=1, result=result, finish_date=cls.now())
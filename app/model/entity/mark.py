@@ -1,7 +1,13 @@
-from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+from collections import OrderedDict
 
-from app.model.db import seq
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.model.db import db, seq
+from .criteria import Criteria
 from .entity_base import EntityBase
+from .normalized_score import NormalizedScore
+from ...util.functions import Conflict
 
 
 class Mark(EntityBase):
@@ -13,12 +19,15 @@ class Mark(EntityBase):
     solution_id = Column(Integer, ForeignKey('solution.solution_id'))
     score = Column(Integer, nullable=False)
     comment = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
 
     create_date = Column(DateTime, default=EntityBase.now)
     update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
     last_change_by_id = Column(Integer)
 
-    serialize_items_list = ['mark_id', 'criteria_id', 'staff_id', 'solution_id', 'score', 'comment',
+    idx_mark = Index('uq_mark_solution_staff_criteria', solution_id, staff_id, criteria_id, unique=True)
+
+    serialize_items_list = ['mark_id', 'criteria_id', 'staff_id', 'solution_id', 'score', 'comment', 'version',
                             'create_date', 'update_date', 'last_change_by_id']
 
     update_fields = ['score', 'comment', 'last_change_by_id']
@@ -44,14 +53,55 @@ class Mark(EntityBase):
         return [cls.dict_item(mark) for mark in cls.query.filter_by(solution_id=solution_id, criteria_id=criteria_id)]
 
     @classmethod
-    def create(cls, data):
-        mark = cls(criteria_id=data['criteria_id'], staff_id=data['staff_id'], solution_id=data['solution_id'],
-                   score=data['score'], comment=data['comment'], last_change_by_id=data['last_change_by_id'])
-
-        mark.add()
-        mark_dict = mark.to_dict()
+    def get_aggregates_by_solutions(cls, solution_ids, score=None):
+        """
+        Aggregates scores of the solutions per criteria in one query, score is a column of mark or normalized_score
+        and defaults to the raw score. The weighted total of a solution sums its criteria means multiplied
+        by the criteria weights.
+        """
+        score = cls.score if score is None else score
+        entity = score.class_
+        mean = func.avg(score)
+        rows = db.session.query(
+            entity.solution_id, entity.criteria_id, Criteria.weight, func.count(), mean,
+            func.percentile_cont(0.5).within_group(score), func.min(score), func.max(score),
+            func.sum(Criteria.weight * mean).over(partition_by=entity.solution_id)
+        ).join(Criteria, Criteria.criteria_id == entity.criteria_id).filter(
+            entity.solution_id.in_(solution_ids)
+        ).group_by(entity.solution_id, entity.criteria_id, Criteria.weight).order_by(
+            entity.solution_id, entity.criteria_id
+        )
+
+        aggregates = {}
+        for solution_id, criteria_id, weight, count, average, median, minimum, maximum, total in rows:
+            solution_aggregates = aggregates.setdefault(solution_id, OrderedDict([
+                ('score_aggregates', []), ('weighted_total', float(total))
+            ]))
+            solution_aggregates['score_aggregates'].append(OrderedDict([
+                ('criteria_id', criteria_id), ('weight', weight), ('count', count), ('mean', float(average)),
+                ('median', median), ('minimum', float(minimum)), ('maximum', float(maximum))
+            ]))
+        return aggregates
 
-        return mark_dict
+    @classmethod
+    def create(cls, data):
+        """
+        Inserts the mark unless the judge already marked the solution in the criteria, the unique index decides
+        so that concurrent requests can not both pass the check.
+        """
+        now = cls.now()
+        with db.auto_commit():
+            mark_id = db.session.execute(insert(cls.__table__).values(
+                mark_id=seq.next_value(), criteria_id=data['criteria_id'], staff_id=data['staff_id'],
+                solution_id=data['solution_id'], score=data['score'], comment=data['comment'], version=1,
+                create_date=now, update_date=now, last_change_by_id=data['last_change_by_id']
+            ).on_conflict_do_nothing(
+                index_elements=['solution_id', 'staff_id', 'criteria_id']
+            ).returning(cls.__table__.c.mark_id)).scalar()
+        if mark_id is None:
+            return None, f'Mark of solution with id {data["solution_id"]} in criteria with id ' \
+                         f'{data["criteria_id"]} already exists'
+        return cls.get_mark_by_id(mark_id)
 
     @classmethod
     def update(cls, data):
@@ -63,11 +113,71 @@ class Mark(EntityBase):
         if not cls._is_update_fields(data):
             return mark_dict
 
-        mark = cls.from_dict(mark_dict)
-        mark._update_simple_fields(data)
-        mark_dict = mark.to_dict()
+        conflict = Conflict(f'Mark with id {data["mark_id"]} was changed by someone else, reload it and retry')
+        if data.get('version') not in (None, mark_dict['version']):
+            return None, conflict
+        with db.auto_commit():
+            if not cls._update_versioned(cls.mark_id == data['mark_id'], mark_dict['version'], data):
+                return None, conflict
+
+        return cls.get_mark_by_id(data['mark_id'])
 
-        return mark_dict
+    @classmethod
+    def _check_batch_item(cls, item, solution_events, seen):
+        key = (item['solution_id'], item['criteria_id'])
+        if key in seen:
+            return 'Mark is repeated in the batch'
+        seen.add(key)
+        event_id = solution_events.get(item['solution_id'])
+        if event_id is None:
+            return f'Solution with id {item["solution_id"]} was not found'
+        criteria = Criteria.get_event_criteria(event_id, item['criteria_id'])
+        if criteria is None:
+            return f'Criteria with id {item["criteria_id"]} is not used by event with id {event_id}'
+        if item['score'] > criteria['maximum'] or item['score'] < criteria['minimum']:
+            return 'Недопустимая оценка'
+        return None
+
+    @classmethod
+    def upsert_batch(cls, items, staff_id, last_change_by_id):
+        """
+        Creates or overwrites marks of the staff from a list of {solution_id, criteria_id, score, comment}
+        in one statement. Invalid items are skipped and reported in errors with their position in the list.
+        """
+        from .solution import Solution
+
+        solution_ids = {item['solution_id'] for item in items}
+        solution_events = dict(db.session.query(Solution.solution_id, Solution.event_id).filter(
+            Solution.solution_id.in_(solution_ids)
+        ))
+
+        now = cls.now()
+        values, errors, seen = [], [], set()
+        for index, item in enumerate(items):
+            error = cls._check_batch_item(item, solution_events, seen)
+            if error is not None:
+                errors.append(OrderedDict([('index', index), ('solution_id', item['solution_id']),
+                                           ('criteria_id', item['criteria_id']), ('error', error)]))
+                continue
+            values.append(dict(mark_id=seq.next_value(), solution_id=item['solution_id'], staff_id=staff_id,
+                               criteria_id=item['criteria_id'], score=item['score'], comment=item.get('comment'),
+                               version=1, create_date=now, update_date=now, last_change_by_id=last_change_by_id))
+
+        mark_ids = []
+        if values:
+            statement = insert(cls.__table__).values(values)
+            with db.auto_commit():
+                mark_ids = [mark_id for mark_id, in db.session.execute(statement.on_conflict_do_update(
+                    index_elements=['solution_id', 'staff_id', 'criteria_id'],
+                    set_={'score': statement.excluded.score,
+                          'comment': func.coalesce(statement.excluded.comment, cls.__table__.c.comment),
+                          'update_date': statement.excluded.update_date,
+                          'last_change_by_id': statement.excluded.last_change_by_id,
+                          'version': cls.__table__.c.version + 1}
+                ).returning(cls.__table__.c.mark_id))]
+
+        marks = cls.query.filter(cls.mark_id.in_(mark_ids)).order_by(cls.solution_id, cls.criteria_id).all()
+        return OrderedDict([('marks', [mark.to_dict() for mark in marks]), ('errors', errors)])
 
     @classmethod
     def delete(cls, mark_id):
@@ -79,6 +189,21 @@ class Mark(EntityBase):
 
     @classmethod
     def delete_by_solution(cls, solution_id):
-        marks = cls.get_marks_by_solution(solution_id)
-        for mark in marks:
-            cls._delete(mark)
+        return cls.delete_by_solutions([solution_id])
+
+    @classmethod
+    def delete_by_solutions(cls, solution_ids):
+        """
+        Deletes marks of solution_ids, a list or a select of ids, inside the current transaction.
+        """
+        deleted = NormalizedScore.delete_by_solutions(solution_ids)
+        deleted[cls.__tablename__] = cls.query.filter(cls.solution_id.in_(solution_ids)).delete(
+            synchronize_session=False
+        )
+        return deleted
+
+    @classmethod
+    def delete_by_staff(cls, staff_id):
+        deleted = NormalizedScore.delete_by_staff(staff_id)
+        deleted[cls.__tablename__] = cls.query.filter_by(staff_id=staff_id).delete(synchronize_session=False)
+        return deleted
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from sqlalchemy import Column, DateTime, Float, Integer, ForeignKey, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.model.db import db
+from .entity_base import EntityBase
+from ...util import get_data_frame_from_query
+
+
+class NormalizedScore(EntityBase):
+    """
+    Marks of an event normalized per (staff, criteria) so that judges using different parts of the scale
+    become comparable. Reads serve the stored rows, a background job rebuilds them once reads find them stale.
+    """
+    __tablename__ = 'normalized_score'
+
+    Z_SCORE = 'z_score'
+    RANK_SCORE = 'rank_score'
+    NORMALIZATIONS = [Z_SCORE, RANK_SCORE]
+
+    # first key of the advisory lock serializing rebuilds, two key locks never collide with the single key event locks
+    REBUILD_LOCK = 1
+
+    event_id = Column(Integer, ForeignKey('Event.event_id'), primary_key=True)
+    staff_id = Column(Integer, ForeignKey('staff.id'), primary_key=True)
+    criteria_id = Column(Integer, ForeignKey('criteria.criteria_id'), primary_key=True)
+    solution_id = Column(Integer, ForeignKey('solution.solution_id'), primary_key=True)
+    score = Column(Integer, nullable=False)
+    z_score = Column(Float, nullable=False)
+    rank_score = Column(Float, nullable=False)
+
+    update_date = Column(DateTime, default=EntityBase.now)
+
+    serialize_items_list = ['event_id', 'staff_id', 'criteria_id', 'solution_id', 'score', 'z_score', 'rank_score',
+                            'update_date']
+
+    @classmethod
+    def get_scores(cls, event_id):
+        return [cls.dict_item(score) for score in cls.query.filter_by(event_id=event_id).order_by(
+            cls.staff_id, cls.criteria_id, cls.solution_id
+        )]
+
+    @classmethod
+    def get_update_date(cls, event_id):
+        return db.session.query(func.max(cls.update_date)).filter(cls.event_id == event_id).scalar()
+
+    @classmethod
+    def _marks_query(cls, event_id, *columns):
+        from .mark import Mark
+        from .solution import Solution
+
+        return db.session.query(*columns).select_from(Mark).join(
+            Solution, Solution.solution_id == Mark.solution_id
+        ).filter((Solution.event_id == event_id) & Mark.staff_id.isnot(None))
+
+    @classmethod
+    def is_stale(cls, event_id):
+        """
+        Tells whether a mark of the event was added, changed or deleted since its scores were normalized.
+        """
+        from .mark import Mark
+
+        latest, marks = cls._marks_query(event_id, func.max(Mark.update_date), func.count()).one()
+        update_date, scores = db.session.query(func.max(cls.update_date), func.count()).filter(
+            cls.event_id == event_id
+        ).one()
+        return scores != marks or (latest is not None and latest >= update_date)
+
+    @classmethod
+    def request_refresh(cls, event_id, staff_id=None):
+        """
+        Queues a rebuild of the event scores when they are stale unless one is already waiting to run,
+        so that a burst of mark writes costs one rebuild. Returns the job or None if the scores are current.
+        """
+        from .job import Job
+
+        if not cls.is_stale(event_id):
+            return None
+        return Job.create_once('normalize_scores', dict(event_id=event_id), staff_id)
+
+    @staticmethod
+    def normalize(marks):
+        """
+        Adds z_score and rank_score columns to a data frame of marks normalizing score within every
+        (staff_id, criteria_id) group. rank_score is the percentile of the score among the judge marks from 0 to 1
+        with ties sharing their average rank, a judge giving one score on the criteria gets 0 and 0.5 respectively.
+        """
+        groups = marks.groupby(['staff_id', 'criteria_id'])['score']
+        deviation = groups.transform('std', ddof=0)
+        marks['z_score'] = np.where(deviation > 0, (marks['score'] - groups.transform('mean')) / deviation, 0.0)
+        count = groups.transform('count')
+        marks['rank_score'] = np.where(count > 1, (groups.rank(method='average') - 1) / (count - 1), 0.5)
+        return marks
+
+    @classmethod
+    def rebuild(cls, event_id):
+        """
+        Replaces normalized scores of the event with ones computed from its current marks, returns their amount.
+        They are dated before the marks are read, so marks changed meanwhile leave them stale.
+        Rebuilds of one event run one at a time, a later one reads the marks after an earlier one committed.
+        """
+        from .mark import Mark
+
+        with db.auto_commit():
+            db.session.execute(select(func.pg_advisory_xact_lock(cls.REBUILD_LOCK, event_id)))
+            now = cls.now()
+            marks = cls.normalize(get_data_frame_from_query(cls._marks_query(
+                event_id, Mark.staff_id, Mark.criteria_id, Mark.solution_id, Mark.score
+            )))
+            rows = [dict(event_id=event_id, staff_id=int(staff_id), criteria_id=int(criteria_id),
+                         solution_id=int(solution_id), score=int(score), z_score=float(z_score),
+                         rank_score=float(rank_score), update_date=now)
+                    for staff_id, criteria_id, solution_id, score, z_score, rank_score in marks[[
+                        'staff_id', 'criteria_id', 'solution_id', 'score', 'z_score', 'rank_score'
+                    ]].itertuples(index=False)]
+            cls.query.filter_by(event_id=event_id).delete()
+            if rows:
+                db.session.execute(insert(cls.__table__).values(rows))
+        return len(rows)
+
+    @classmethod
+    def delete_by_solutions(cls, solution_ids):
+        """
+        Deletes scores of the whole events of the solutions, the remaining ones are rebuilt once read stale.
+        """
+        from .solution import Solution
+
+        deleted = cls.query.filter(cls.event_id.in_(
+            select(Solution.event_id).where(Solution.solution_id.in_(solution_ids))
+        )).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
+
+    @classmethod
+    def delete_by_staff(cls, staff_id):
+        deleted = cls.query.filter_by(staff_id=staff_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
@@ -1,7 +1,24 @@
-from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+import numpy as np
 
-from app.model.db import seq
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, ForeignKey, Index, bindparam, event, func, select, \
+    text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.model.db import db, seq
+from .criteria import Criteria
 from .entity_base import EntityBase
+from .event import Event
+from .pairing_progress import PairingProgress
+from .pairing_standing import PairingStanding
+from .solution_rating import SolutionRating
+from ...util.comparisons import ComparisonStore
+from ...util.functions import Conflict, LruCache
+from ...util.ordering import OrderingGraph
+from ...util.ranking import bradley_terry_scores, copeland_scores
 
 
 class PairingMark(EntityBase):
@@ -12,52 +29,94 @@ class PairingMark(EntityBase):
     staff_id = Column(Integer, ForeignKey('staff.id'))
     first_solution_id = Column(Integer, ForeignKey('solution.solution_id'))
     second_solution_id = Column(Integer, ForeignKey('solution.solution_id'))
-    event_id = Column(Integer, ForeignKey('Event.event_id'))
+    event_id = Column(Integer, ForeignKey('Event.event_id'), primary_key=True)
+    low_solution_id = Column(Integer)
+    high_solution_id = Column(Integer)
+    is_reversed = Column(Boolean, default=False, server_default='false')
     score = Column(Integer, nullable=False)
     comment = Column(String, nullable=True)
+    reserved_until = Column(DateTime, nullable=True)
+    swiss_round = Column(Integer, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
 
     create_date = Column(DateTime, default=EntityBase.now)
     update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
     last_change_by_id = Column(Integer)
 
+    idx_pair = Index('uq_pairing_mark_pair', event_id, staff_id, criteria_id, low_solution_id, high_solution_id,
+                     unique=True)
+    idx_low = Index('idx_pairing_mark_low', low_solution_id, staff_id, criteria_id)
+    idx_high = Index('idx_pairing_mark_high', high_solution_id, staff_id, criteria_id)
+    idx_update = Index('idx_pairing_mark_update', event_id, staff_id, criteria_id, update_date)
+    idx_staff_event_score = Index('idx_pairing_mark_staff_event_score', staff_id, event_id, score)
+    idx_swiss_round = Index('idx_pairing_mark_swiss_round', event_id, swiss_round)
+
+    # every event gets its own partition, see create_partition
+    __table_args__ = {'postgresql_partition_by': 'LIST (event_id)'}
+
     serialize_items_list = ['pairing_mark_id', 'criteria_id', 'staff_id', 'first_solution_id', 'second_solution_id',
-                            'event_id', 'score', 'comment', 'create_date', 'update_date', 'last_change_by_id']
+                            'event_id', 'score', 'comment', 'swiss_round', 'version', 'create_date',
+                            'update_date', 'last_change_by_id']
 
     update_fields = ['score', 'comment', 'last_change_by_id']
 
     update_simple_fields = ['score', 'comment', 'last_change_by_id']
 
+    tracked_items_list = ['pairing_mark_id', 'staff_id', 'event_id', 'criteria_id', 'first_solution_id',
+                          'second_solution_id', 'score']
+
+    ordering_graphs = LruCache(256)
+    comparison_stores = LruCache(8)
+
+    INFERENCE_ATTEMPTS = 3
+
     @classmethod
-    def get_mark_by_id(cls, pairing_mark_id):
+    def get_mark_by_id(cls, pairing_mark_id, event_id):
+        return cls.dict_item(cls.query.filter_by(event_id=event_id, pairing_mark_id=pairing_mark_id).first())
+
+    @classmethod
+    def get_item_by_id(cls, pairing_mark_id):
+        """
+        Looks the mark up in every partition, meant for generic admin lookups only.
+        """
         return cls.dict_item(cls.query.filter_by(pairing_mark_id=pairing_mark_id).first())
 
-    get_item_by_id = get_mark_by_id
+    @staticmethod
+    def canonical_pair(first_solution_id, second_solution_id):
+        return (min(first_solution_id, second_solution_id), max(first_solution_id, second_solution_id),
+                first_solution_id > second_solution_id)
+
+    @classmethod
+    def _solution_filter(cls, solution_id):
+        from .solution import Solution
+
+        # the event key lets postgres skip partitions of other events while executing the query
+        event_id = select(Solution.event_id).where(Solution.solution_id == solution_id).scalar_subquery()
+        return (cls.event_id == event_id) & (
+            (cls.low_solution_id == solution_id) | (cls.high_solution_id == solution_id)
+        )
 
     @classmethod
-    def get_mark_by_ids_staff_and_criteria(cls, first_solution_id, second_solution_id, staff_id, criteria_id):
-        return cls.dict_item(cls.query.filter(
-            (((PairingMark.first_solution_id == first_solution_id)
-                & (PairingMark.second_solution_id == second_solution_id))
-            | ((PairingMark.first_solution_id == second_solution_id)
-                & (PairingMark.second_solution_id == first_solution_id)))
-             & (PairingMark.criteria_id == criteria_id)
-            & (PairingMark.staff_id == staff_id)
+    def get_mark_by_ids_staff_and_criteria(cls, first_solution_id, second_solution_id, staff_id, criteria_id,
+                                           event_id):
+        low_solution_id, high_solution_id, _ = cls.canonical_pair(first_solution_id, second_solution_id)
+        return cls.dict_item(cls.query.filter_by(
+            event_id=event_id, staff_id=staff_id, criteria_id=criteria_id, low_solution_id=low_solution_id,
+            high_solution_id=high_solution_id
         ).first())
 
     @classmethod
     def get_marks_by_solution(cls, solution_id):
         return [
             cls.dict_item(mark) for mark in cls.query.filter(
-                ((PairingMark.first_solution_id == solution_id) | (PairingMark.second_solution_id == solution_id))
-                & (PairingMark.score != -1)
+                cls._solution_filter(solution_id) & (PairingMark.score != -1)
             )]
 
     @classmethod
     def get_marks_by_solution_and_staff(cls, solution_id, staff_id):
         return [
             cls.dict_item(mark) for mark in cls.query.filter(
-                ((PairingMark.first_solution_id == solution_id) | (PairingMark.second_solution_id == solution_id))
-                & (PairingMark.staff_id == staff_id)
+                cls._solution_filter(solution_id) & (PairingMark.staff_id == staff_id)
             )
         ]
 
@@ -65,7 +124,7 @@ class PairingMark(EntityBase):
     def get_marks_by_solution_staff_and_criteria(cls, solution_id, staff_id, criteria_id):
         return [
             cls.dict_item(mark) for mark in cls.query.filter(
-                ((PairingMark.first_solution_id == solution_id) | (PairingMark.second_solution_id == solution_id))
+                cls._solution_filter(solution_id)
                 & (PairingMark.criteria_id == criteria_id)
                 & (PairingMark.staff_id == staff_id)
                 & (PairingMark.score != -1)
@@ -76,120 +135,516 @@ class PairingMark(EntityBase):
     def get_marks_by_solution_and_criteria(cls, solution_id, criteria_id):
         return [
             cls.dict_item(mark) for mark in cls.query.filter(
-                ((PairingMark.first_solution_id == solution_id) | (PairingMark.second_solution_id == solution_id))
-                & (PairingMark.criteria_id == criteria_id)
+                cls._solution_filter(solution_id) & (PairingMark.criteria_id == criteria_id)
             )
         ]
 
     @classmethod
-    def automatic_create_mark(cls, payload, score, first_id):
-        mark = cls.get_mark_by_ids_staff_and_criteria(
-            payload['first_solution_id'], payload['second_solution_id'], payload['staff_id'], payload['criteria_id']
-        )
-        if mark['score'] != -1:
-            return mark
-        if mark['first_solution_id'] != first_id:
-            score = 2 - score
-        payload['comment'] = ''
-        payload['score'] = score
-        payload['pairing_mark_id'] = mark['pairing_mark_id']
-        mark = cls.update(payload)
-        return mark
+    def get_ranking(cls, event_id):
+        if Event.get_event_by_id(event_id) is None:
+            return None, f'Event with id {event_id} was not found'
+
+        comparisons = cls.get_comparisons(event_id)
+        event_criteria_ids = set(Criteria.get_criteria_ids_by_event(event_id))
+        criteria_ids = tuple(criteria_id for criteria_id in comparisons.criteria_ids()
+                             if criteria_id in event_criteria_ids)
+        # the store drops rankings when judgments change, repeated requests in between are served from it
+        if criteria_ids not in comparisons.rankings:
+            comparisons.rankings[criteria_ids] = cls._rank(comparisons, criteria_ids)
+        return OrderedDict([('event_id', event_id), ('ranking', comparisons.rankings[criteria_ids])])
+
+    @staticmethod
+    def _rank(comparisons, criteria_ids):
+        solution_ids = comparisons.solution_ids
+        # overall counts are summed from the per criteria ones so that every judge matrix is read once,
+        # the overall fit is then a close starting point for the per criteria ones
+        size = len(solution_ids)
+        wins, draws = np.zeros((size, size)), np.zeros((size, size))
+        criteria_counts = []
+        for criteria_id in criteria_ids:
+            criteria_wins, criteria_draws = comparisons.counts([criteria_id])
+            wins += criteria_wins
+            draws += criteria_draws
+            criteria_counts.append((criteria_id, criteria_wins, criteria_draws))
+        copeland, bradley_terry = copeland_scores(wins, draws), bradley_terry_scores(wins, draws)
+        criteria_scores = [(criteria_id, copeland_scores(criteria_wins, criteria_draws),
+                            bradley_terry_scores(criteria_wins, criteria_draws, initial=bradley_terry))
+                           for criteria_id, criteria_wins, criteria_draws in criteria_counts]
+
+        ranking = []
+        for rank, i in enumerate(np.lexsort((solution_ids, -copeland, -bradley_terry)), 1):
+            ranking.append(OrderedDict([
+                ('rank', rank), ('solution_id', int(solution_ids[i])),
+                ('copeland', float(copeland[i])), ('bradley_terry', round(float(bradley_terry[i]), 4)),
+                ('criteria', [OrderedDict([('criteria_id', int(criteria_id)),
+                                           ('copeland', float(criteria_copeland[i])),
+                                           ('bradley_terry', round(float(criteria_bradley_terry[i]), 4))])
+                              for criteria_id, criteria_copeland, criteria_bradley_terry in criteria_scores])
+            ]))
+        return ranking
 
     @classmethod
-    def get_pair_for_marking(cls, staff_id, event_id):
-        pair = cls.dict_item(cls.query.filter_by(staff_id=staff_id, event_id=event_id, score=-1).first())
-        any_pair = cls.dict_item(cls.query.filter_by(staff_id=staff_id, event_id=event_id).first())
-        if pair is not None:
-            return pair
-        if any_pair is None:
+    def _get_event_stamp(cls, event_id):
+        return tuple(db.session.query(func.max(cls.update_date), func.count().filter(cls.score != -1)).filter(
+            cls.event_id == event_id
+        ).one())
+
+    @classmethod
+    def _load_comparisons(cls, comparisons, condition):
+        # one row of arrays per judge and criteria keeps row materialization out of the hot path
+        rows = db.session.query(
+            cls.criteria_id, cls.staff_id, func.array_agg(cls.low_solution_id), func.array_agg(cls.high_solution_id),
+            func.array_agg(cls.score), func.array_agg(cls.is_reversed)
+        ).filter(condition).group_by(cls.criteria_id, cls.staff_id)
+        for criteria_id, staff_id, low, high, scores, is_reversed in rows:
+            scores = np.array(scores, dtype=np.int8)
+            low_scores = np.where(np.array(is_reversed, dtype=bool) & (scores != -1), 2 - scores, scores)
+            if not comparisons.set_scores(criteria_id, staff_id, np.array(low, dtype=np.int64),
+                                          np.array(high, dtype=np.int64), low_scores.astype(np.int8)):
+                return False
+        return True
+
+    @classmethod
+    def get_comparisons(cls, event_id):
+        """
+        Returns judgments of the event from memory of the worker. The store is loaded once, later calls apply
+        only the marks written since the latest update date it has seen, by this worker or any other.
+        It is loaded again when judged marks were deleted or solutions of the event changed.
+        """
+        from .solution import Solution
+
+        stamp = cls._get_event_stamp(event_id)
+        solution_ids = [solution_id for solution_id, in db.session.query(Solution.solution_id).filter_by(
+            event_id=event_id
+        ).order_by(Solution.solution_id)]
+        cached = cls.comparison_stores.get(event_id)
+        if cached is not None and cached[1].solution_ids.tolist() == solution_ids:
+            cached_stamp, comparisons = cached
+            if cached_stamp == stamp:
+                return comparisons
+            if cached_stamp[0] is not None and cls._load_comparisons(
+                comparisons, (cls.event_id == event_id) & (cls.update_date >= cached_stamp[0])
+            ) and comparisons.judged == stamp[1]:
+                cls.comparison_stores[event_id] = (stamp, comparisons)
+                return comparisons
+
+        comparisons = ComparisonStore(solution_ids)
+        cls._load_comparisons(comparisons, (cls.event_id == event_id) & (cls.score != -1))
+        cls.comparison_stores[event_id] = (stamp, comparisons)
+        return comparisons
+
+    @classmethod
+    def _track_changes(cls, changes):
+        """
+        Keeps derived per-judge and per-solution data in sync with (before, after) mark dicts
+        inside the current transaction. before is None for created marks, after is None for deleted ones.
+        """
+        progress_deltas = defaultdict(lambda: [0, 0])
+        standing_deltas = defaultdict(lambda: [0, 0, 0])
+        judgments = []
+        for before, after in changes:
+            for mark_dict, sign in ((before, -1), (after, 1)):
+                if mark_dict is None:
+                    continue
+                delta = progress_deltas[(mark_dict['staff_id'], mark_dict['event_id'])]
+                delta[0] += sign
+                delta[1] += sign * (mark_dict['score'] == -1)
+                if mark_dict['score'] == -1:
+                    continue
+                judgments.append((mark_dict['event_id'], mark_dict['criteria_id'], mark_dict['first_solution_id'],
+                                  mark_dict['second_solution_id'], mark_dict['score'], sign))
+                outcomes = PairingStanding.outcomes(mark_dict['score'])
+                for solution_id, solution_outcomes in ((mark_dict['first_solution_id'], outcomes),
+                                                       (mark_dict['second_solution_id'], outcomes[::-1])):
+                    delta = standing_deltas[(mark_dict['event_id'], mark_dict['criteria_id'], solution_id)]
+                    for i, outcome in enumerate(solution_outcomes):
+                        delta[i] += sign * outcome
+        PairingProgress.apply_deltas(progress_deltas)
+        PairingStanding.apply_deltas(standing_deltas)
+        SolutionRating.apply_judgments(judgments)
+
+    @classmethod
+    def _tracked_dict(cls, row):
+        return {key: getattr(row, key) for key in cls.tracked_items_list}
+
+    @classmethod
+    def _reservation_end(cls):
+        return cls.now() + timedelta(seconds=current_app.config['PAIR_RESERVATION_SECONDS'])
+
+    @classmethod
+    def _reserve_pairs(cls, staff_id, event_id, count):
+        now = cls.now()
+        candidates = db.session.query(cls.pairing_mark_id).filter(
+            (cls.staff_id == staff_id) & (cls.event_id == event_id) & (cls.score == -1)
+            & ((cls.reserved_until == None) | (cls.reserved_until < now))
+        ).limit(count).with_for_update(skip_locked=True)
+        with db.auto_commit():
+            reserved = db.session.execute(cls.__table__.update().where(
+                (cls.event_id == event_id) & cls.pairing_mark_id.in_(candidates.statement)
+            ).values(reserved_until=cls._reservation_end()).returning(cls.pairing_mark_id))
+            mark_ids = [row.pairing_mark_id for row in reserved]
+        return cls._get_marks_by_ids(mark_ids, [event_id])
+
+    @classmethod
+    def _create_insertion_pairs(cls, staff_id, event_id, count):
+        from .solution import Solution
+
+        pairs = []
+        solution_ids = sorted(solution['solution_id'] for solution in Solution.get_solutions_by_event(event_id))
+        for criteria in Criteria.get_criterias_by_event(event_id):
+            if len(pairs) == count:
+                break
+            graph = cls.get_ordering_graph(event_id, staff_id, criteria['criteria_id'])
+            next_pair = graph.next_insertion_pair(solution_ids)
+            if next_pair is None:
+                continue
+            # the pair may already be waiting for the judge in another tab
+            pair = cls.create(dict(criteria_id=criteria['criteria_id'], staff_id=staff_id, event_id=event_id,
+                                   first_solution_id=next_pair[0], second_solution_id=next_pair[1], score=-1,
+                                   comment='', last_change_by_id=staff_id, reserved_until=cls._reservation_end()))
+            if not isinstance(pair, tuple):
+                pairs.append(pair)
+        return pairs
+
+    @classmethod
+    def get_pairs_for_marking(cls, staff_id, event_id, count=1):
+        from .solution import Solution
+
+        event = Event.get_event_by_id(event_id)
+        if event is None:
+            return None, f'Event with id {event_id} was not found'
+
+        pairs = cls._reserve_pairs(staff_id, event_id, count)
+        if len(pairs) < count and event['evaluation_method'] == Event.BINARY_INSERTION_EVALUATION:
+            pairs.extend(cls._create_insertion_pairs(staff_id, event_id, count - len(pairs)))
+        if not pairs and event['evaluation_method'] == Event.SWISS_EVALUATION and Solution.is_swiss_round_due(event):
+            if Solution.create_swiss_round(event_id):
+                pairs = cls._reserve_pairs(staff_id, event_id, count)
+        progress = PairingProgress.get_progress(staff_id, event_id)
+        if progress is None:
             return None
-        return { 'all_marked': True }
-
-    @classmethod
-    def auto_create_marks(cls, data):
-        first_solution_id = data['first_solution_id']
-        second_solution_id = data['second_solution_id']
-        staff_id = data['staff_id']
-        score = data['score']
-        criteria_id = data['criteria_id']
-
-        mark_list = []
-
-        first_solution_marks = cls.get_marks_by_solution_staff_and_criteria(first_solution_id, staff_id, criteria_id)
-        second_solution_marks = cls.get_marks_by_solution_staff_and_criteria(second_solution_id, staff_id, criteria_id)
-        for item in first_solution_marks:
-            if item['first_solution_id'] == second_solution_id or item['second_solution_id'] == second_solution_id:
-                print()
-            elif item['first_solution_id'] == first_solution_id:
-                if (score == 2 and (item['score'] <= 1)) or (score == 0 and (item['score'] >= 1)):
-                    payload = data
-                    payload['first_solution_id'] = item['second_solution_id']
-                    mark = cls.automatic_create_mark(payload, score, payload['first_solution_id'])
-                    mark_list.append(mark)
-                elif score == 1:
-                    payload = data
-                    payload['first_solution_id'] = item['second_solution_id']
-                    mark = cls.automatic_create_mark(payload, 2 - item['score'], payload['first_solution_id'])
-                    mark_list.append(mark)
-            else:
-                if (score == 2 and (item['score'] >= 1)) or (score == 0 and (item['score'] <= 1)):
-                    payload = data
-                    payload['first_solution_id'] = item['first_solution_id']
-                    mark = cls.automatic_create_mark(payload, score, payload['first_solution_id'])
-                    mark_list.append(mark)
-                elif score == 1:
-                    payload = data
-                    payload['first_solution_id'] = item['first_solution_id']
-                    mark = cls.automatic_create_mark(payload, item['score'], payload['first_solution_id'])
-                    mark_list.append(mark)
-        for item in second_solution_marks:
-            if item['first_solution_id'] == first_solution_id or item['second_solution_id'] == first_solution_id:
-                print()
-            elif item['first_solution_id'] == second_solution_id:
-                if (score == 2 and (item['score'] >= 1)) or (score == 0 and (item['score'] <= 1)):
-                    payload = data
-                    payload['second_solution_id'] = item['second_solution_id']
-                    mark = cls.automatic_create_mark(payload, score, payload['first_solution_id'])
-                    mark_list.append(mark)
-                elif score == 1:
-                    payload = data
-                    payload['second_solution_id'] = item['second_solution_id']
-                    mark = cls.automatic_create_mark(payload, item['score'], payload['first_solution_id'])
-                    mark_list.append(mark)
-            else:
-                if (score == 2 and (item['score'] <= 1)) or (score == 0 and (item['score'] >= 1)):
-                    payload = data
-                    payload['second_solution_id'] = item['first_solution_id']
-                    mark = cls.automatic_create_mark(payload, score, payload['first_solution_id'])
-                    mark_list.append(mark)
-                elif score == 1:
-                    payload = data
-                    payload['second_solution_id'] = item['first_solution_id']
-                    mark = cls.automatic_create_mark(payload, 2 - item['score'], payload['first_solution_id'])
-                    mark_list.append(mark)
-        return mark_list
+
+        solution_ids = {pair[key] for pair in pairs for key in ('first_solution_id', 'second_solution_id')}
+        solutions = [solution.to_dict() for solution in
+                     Solution.query.filter(Solution.solution_id.in_(solution_ids)).order_by(Solution.solution_id)]
+        return OrderedDict([('pairs', pairs), ('solutions', solutions),
+                            ('progress', OrderedDict([('total', progress['total']),
+                                                      ('remaining', progress['remaining'])])),
+                            ('all_marked', progress['remaining'] == 0)])
+
+    @classmethod
+    def get_pair_for_marking(cls, staff_id, event_id):
+        result = cls.get_pairs_for_marking(staff_id, event_id)
+        if not isinstance(result, OrderedDict):
+            return result
+        if result['pairs']:
+            pair = result['pairs'][0]
+        elif result['all_marked']:
+            pair = {'all_marked': True}
+        else:
+            pair = {'all_reserved': True}
+        pair['progress'] = result['progress']
+        return pair
 
     @classmethod
     def create(cls, data):
-        mark = cls(criteria_id=data['criteria_id'], staff_id=data['staff_id'], event_id=data['event_id'],
-                   first_solution_id=data['first_solution_id'], second_solution_id=data['second_solution_id'],
-                   score=data['score'], comment=data['comment'], last_change_by_id=data['last_change_by_id'])
+        """
+        Lets the unique pair index reject duplicates, so concurrent requests for the same pair can not both insert.
+        """
+        low_solution_id, high_solution_id, is_reversed = cls.canonical_pair(data['first_solution_id'],
+                                                                            data['second_solution_id'])
+        now = cls.now()
+        with db.auto_commit():
+            row = db.session.execute(insert(cls.__table__).values(
+                pairing_mark_id=seq.next_value(), criteria_id=data['criteria_id'], staff_id=data['staff_id'],
+                event_id=data['event_id'], first_solution_id=data['first_solution_id'],
+                second_solution_id=data['second_solution_id'], low_solution_id=low_solution_id,
+                high_solution_id=high_solution_id, is_reversed=is_reversed, score=data['score'],
+                comment=data['comment'], version=1, create_date=now, update_date=now,
+                last_change_by_id=data['last_change_by_id'], reserved_until=data.get('reserved_until')
+            ).on_conflict_do_nothing(
+                index_elements=['event_id', 'staff_id', 'criteria_id', 'low_solution_id', 'high_solution_id']
+            ).returning(*[cls.__table__.c[key] for key in cls.tracked_items_list])).first()
+            if row is not None:
+                cls._track_changes([(None, cls._tracked_dict(row))])
+        if row is None:
+            return None, f'Pairing mark for solutions {data["first_solution_id"]} and ' \
+                         f'{data["second_solution_id"]} already exists'
+        return cls.get_mark_by_id(row.pairing_mark_id, data['event_id'])
+
+    @classmethod
+    def _get_update_stamp(cls, event_id, staff_id, criteria_id):
+        return db.session.query(func.max(cls.update_date)).filter_by(
+            event_id=event_id, staff_id=staff_id, criteria_id=criteria_id
+        ).scalar()
 
-        mark.add()
-        mark_dict = mark.to_dict()
+    @classmethod
+    def get_ordering_graph(cls, event_id, staff_id, criteria_id):
+        key = (event_id, staff_id, criteria_id)
+        stamp = cls._get_update_stamp(*key)
+        cached = cls.ordering_graphs.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        graph = cls._load_ordering_graph(*key)
+        cls.ordering_graphs[key] = (stamp, graph)
+        return graph
 
-        return mark_dict
+    @classmethod
+    def _load_ordering_graph(cls, event_id, staff_id, criteria_id, exclude_mark_ids=()):
+        marks = db.session.query(cls.first_solution_id, cls.second_solution_id, cls.score).filter(
+            (cls.event_id == event_id) & (cls.staff_id == staff_id) & (cls.criteria_id == criteria_id)
+            & (cls.score != -1) & cls.pairing_mark_id.notin_(exclude_mark_ids)
+        ).order_by(cls.update_date, cls.pairing_mark_id)
+        return OrderingGraph.from_marks(marks)
+
+    @classmethod
+    def get_conflicts(cls, event_id, staff_id=None):
+        """
+        Lists judgments contradicting the order known from earlier judgments of the same judge and criteria.
+        """
+        marks = db.session.query(cls.pairing_mark_id, cls.staff_id, cls.criteria_id, cls.low_solution_id,
+                                 cls.high_solution_id).filter((cls.event_id == event_id) & (cls.score != -1))
+        if staff_id is not None:
+            marks = marks.filter(cls.staff_id == staff_id)
+        mark_ids = {(mark.staff_id, mark.criteria_id, mark.low_solution_id, mark.high_solution_id): mark.pairing_mark_id
+                    for mark in marks}
+
+        conflicts = []
+        for key_staff_id, criteria_id in sorted({key[:2] for key in mark_ids}):
+            graph = cls.get_ordering_graph(event_id, key_staff_id, criteria_id)
+            for first_solution_id, second_solution_id, score, witness_solution_id in graph.conflicts:
+                low_solution_id, high_solution_id, _ = cls.canonical_pair(first_solution_id, second_solution_id)
+                conflicts.append(OrderedDict([
+                    ('pairing_mark_id', mark_ids.get((key_staff_id, criteria_id, low_solution_id, high_solution_id))),
+                    ('staff_id', key_staff_id),
+                    ('criteria_id', criteria_id),
+                    ('first_solution_id', first_solution_id),
+                    ('second_solution_id', second_solution_id),
+                    ('score', score),
+                    ('witness_solution_id', witness_solution_id)
+                ]))
+        return OrderedDict([('event_id', event_id), ('conflicts', conflicts)])
+
+    @classmethod
+    def _apply_implied_marks(cls, event_id, staff_id, criteria_id, implied, last_change_by_id):
+        if not implied:
+            return []
+        params = dict(event_id=event_id, staff_id=staff_id, criteria_id=criteria_id,
+                      last_change_by_id=last_change_by_id, now=cls.now())
+        values = []
+        for i, (first_solution_id, second_solution_id, score) in enumerate(implied):
+            low_solution_id, high_solution_id, is_reversed = cls.canonical_pair(first_solution_id, second_solution_id)
+            params.update({f'low_{i}': low_solution_id, f'high_{i}': high_solution_id,
+                           f'score_{i}': 2 - score if is_reversed else score})
+            values.append(f'(:low_{i}, :high_{i}, :score_{i})')
+        implied_pairs = f'''
+            (VALUES {', '.join(values)}) AS implied (low_solution_id, high_solution_id, score)
+            WHERE pairing_mark.event_id = :event_id AND pairing_mark.staff_id = :staff_id
+                AND pairing_mark.criteria_id = :criteria_id
+                AND pairing_mark.low_solution_id = implied.low_solution_id
+                AND pairing_mark.high_solution_id = implied.high_solution_id
+        '''
+
+        result = db.session.execute(text(f'''
+            UPDATE pairing_mark
+            SET score = CASE WHEN pairing_mark.is_reversed THEN 2 - implied.score ELSE implied.score END,
+                comment = '', update_date = :now, last_change_by_id = :last_change_by_id,
+                version = pairing_mark.version + 1
+            FROM {implied_pairs} AND pairing_mark.score = -1
+            RETURNING {', '.join(f'pairing_mark.{key}' for key in cls.tracked_items_list)}
+        '''), params)
+        updated = [cls._tracked_dict(row) for row in result]
+        mark_ids = [mark_dict['pairing_mark_id'] for mark_dict in updated]
+        # pairs unknown to the graph are unmarked unless other requests have judged them meanwhile
+        if db.session.execute(text(f'''
+            SELECT EXISTS (SELECT 1 FROM pairing_mark, {implied_pairs} AND pairing_mark.score != -1
+                AND pairing_mark.pairing_mark_id != ALL(:mark_ids))
+        '''), dict(params, mark_ids=mark_ids)).scalar():
+            return None
+        cls._track_changes([(dict(mark_dict, score=-1), mark_dict) for mark_dict in updated])
+        return mark_ids
+
+    @classmethod
+    def _infer_marks(cls, key, judgments, graph, judged_mark_ids, last_change_by_id):
+        """
+        Applies marks implied by new judgments of one judge and criteria inside the current transaction.
+        When other requests have judged the same pairs meanwhile the graph is stale, then the implied marks
+        are rolled back and inferred again from a reloaded graph, so judges never wait for each other.
+        Pairs judged by the judgments themselves are already scored and are not implied again.
+        Returns ids of the implied marks and the graph including the judgments, or None twice if it stayed stale.
+        """
+        judged_pairs = {cls.canonical_pair(first_solution_id, second_solution_id)[:2]
+                        for first_solution_id, second_solution_id, _ in judgments}
+        for _ in range(cls.INFERENCE_ATTEMPTS):
+            implied = []
+            for first_solution_id, second_solution_id, score in judgments:
+                implied.extend(graph.add(first_solution_id, second_solution_id, score))
+            implied = [pair for pair in implied if cls.canonical_pair(*pair[:2])[:2] not in judged_pairs]
+            savepoint = db.session.begin_nested()
+            mark_ids = cls._apply_implied_marks(*key, implied, last_change_by_id)
+            if mark_ids is not None:
+                savepoint.commit()
+                return mark_ids, graph
+            savepoint.rollback()
+            graph = cls._load_ordering_graph(*key, judged_mark_ids)
+        return None, None
+
+    @classmethod
+    def _get_marks_by_ids(cls, mark_ids, event_ids):
+        if not mark_ids:
+            return []
+        return [mark.to_dict() for mark in cls.query.filter(
+            cls.event_id.in_(event_ids) & cls.pairing_mark_id.in_(mark_ids)
+        ).order_by(cls.pairing_mark_id)]
 
     @classmethod
     def update_tree(cls, data):
-        mark = cls.update(data)
-        mark_list = cls.auto_create_marks(data)
-        return mark, mark_list
+        mark_dict = cls.get_mark_by_id(data['pairing_mark_id'], data['event_id'])
+        if mark_dict is None:
+            return (None, f'Pair mark with id {data["pairing_mark_id"]} was not found'), []
+
+        key = (mark_dict['event_id'], mark_dict['staff_id'], mark_dict['criteria_id'])
+        if mark_dict['score'] != -1 or data['score'] == -1:
+            mark = cls.update(data)
+            # re-judgments invalidate the order known to the graph
+            if not isinstance(mark, tuple) and mark['score'] != mark_dict['score']:
+                cls.ordering_graphs.pop(key, None)
+            return mark, []
+
+        # the judgment and the marks it implies are saved together, or neither of them is
+        graph = cls.get_ordering_graph(*key)
+        with db.auto_commit():
+            error = cls._apply_update(mark_dict, data)
+            if error is not None:
+                return error, []
+            mark_ids, graph = cls._infer_marks(key, [(mark_dict['first_solution_id'], mark_dict['second_solution_id'],
+                                                      data['score'])], graph, [mark_dict['pairing_mark_id']],
+                                               data['last_change_by_id'])
+            if mark_ids is None:
+                db.session.rollback()
+                cls.ordering_graphs.pop(key, None)
+                return (None, cls._inference_conflict()), []
+        cls._cache_ordering_graph(key, graph)
+        return cls.get_mark_by_id(mark_dict['pairing_mark_id'], key[0]), cls._get_marks_by_ids(mark_ids, [key[0]])
+
+    @classmethod
+    def _cache_ordering_graph(cls, key, graph):
+        if graph is None:
+            cls.ordering_graphs.pop(key, None)
+        else:
+            cls.ordering_graphs[key] = (cls._get_update_stamp(*key), graph)
+
+    @classmethod
+    def update_batch(cls, items, last_change_by_id, event_id):
+        """
+        Applies a list of {pairing_mark_id, score, comment, version} in one transaction and infers
+        implied marks once per (event, staff, criteria) instead of once per mark.
+        Nothing is applied if any of the marks was changed by someone else since its version was read.
+        """
+        mark_ids = [item['pairing_mark_id'] for item in items]
+        if len(set(mark_ids)) != len(mark_ids):
+            return None, 'Pair marks in batch must be unique'
+
+        tracked_columns = [getattr(cls, key) for key in cls.tracked_items_list]
+        rows = db.session.query(*tracked_columns, cls.version).filter(
+            (cls.event_id == event_id) & cls.pairing_mark_id.in_(mark_ids)
+        ).all()
+        before = {row.pairing_mark_id: cls._tracked_dict(row) for row in rows}
+        versions = {row.pairing_mark_id: row.version for row in rows}
+        missing = [mark_id for mark_id in mark_ids if mark_id not in before]
+        if missing:
+            return None, f'Pair marks with ids {", ".join(map(str, missing))} were not found'
+        changed = [item['pairing_mark_id'] for item in items
+                   if item.get('version') not in (None, versions[item['pairing_mark_id']])]
+        if changed:
+            return None, cls._batch_conflict(changed)
+        event_ids = sorted({mark_dict['event_id'] for mark_dict in before.values()})
+
+        # new judgments extend the order known before the batch, re-judgments invalidate it
+        judgments = defaultdict(list)
+        judged_mark_ids = defaultdict(list)
+        rejudged = set()
+        for item in items:
+            mark_dict = before[item['pairing_mark_id']]
+            key = (mark_dict['event_id'], mark_dict['staff_id'], mark_dict['criteria_id'])
+            if mark_dict['score'] == -1:
+                judgments[key].append((mark_dict['first_solution_id'], mark_dict['second_solution_id'],
+                                       item['score']))
+                judged_mark_ids[key].append(item['pairing_mark_id'])
+            elif mark_dict['score'] != item['score']:
+                rejudged.add(key)
+        graphs = {key: cls.get_ordering_graph(*key) for key in judgments}
+
+        params = dict(last_change_by_id=last_change_by_id, now=cls.now(), event_ids=event_ids)
+        values = []
+        for i, item in enumerate(items):
+            params.update({f'id_{i}': item['pairing_mark_id'], f'score_{i}': item['score'],
+                           f'comment_{i}': item.get('comment'), f'version_{i}': versions[item['pairing_mark_id']]})
+            values.append(f'(:id_{i}, :score_{i}, :comment_{i}, :version_{i})')
+
+        implied_ids = []
+        with db.auto_commit():
+            result = db.session.execute(text(f'''
+                UPDATE pairing_mark
+                SET score = batch.score, comment = COALESCE(batch.comment, pairing_mark.comment),
+                    update_date = :now, last_change_by_id = :last_change_by_id, version = pairing_mark.version + 1
+                FROM (VALUES {', '.join(values)}) AS batch (pairing_mark_id, score, comment, version)
+                WHERE pairing_mark.event_id IN :event_ids AND pairing_mark.pairing_mark_id = batch.pairing_mark_id
+                    AND pairing_mark.version = batch.version
+                RETURNING {', '.join(f'pairing_mark.{key}' for key in cls.tracked_items_list)}
+            ''').bindparams(bindparam('event_ids', expanding=True)), params).fetchall()
+            if len(result) != len(items):
+                db.session.rollback()
+                updated_ids = {row.pairing_mark_id for row in result}
+                return None, cls._batch_conflict([mark_id for mark_id in mark_ids if mark_id not in updated_ids])
+            cls._track_changes([(before[row.pairing_mark_id], cls._tracked_dict(row)) for row in result])
+            for key, key_judgments in judgments.items():
+                key_implied_ids, graphs[key] = cls._infer_marks(key, key_judgments, graphs[key],
+                                                                judged_mark_ids[key], last_change_by_id)
+                if key_implied_ids is None:
+                    db.session.rollback()
+                    cls.ordering_graphs.pop(key, None)
+                    return None, cls._inference_conflict()
+                implied_ids.extend(key_implied_ids)
+
+        for key in judgments.keys() | rejudged:
+            cls._cache_ordering_graph(key, None if key in rejudged else graphs[key])
+        return OrderedDict([('updated_marks', cls._get_marks_by_ids(mark_ids, event_ids)),
+                            ('automatically_updated_marks', cls._get_marks_by_ids(implied_ids, event_ids))])
+
+    @classmethod
+    def _batch_conflict(cls, mark_ids):
+        return Conflict(f'Pair marks with ids {", ".join(map(str, mark_ids))} were changed by someone else, '
+                        f'reload them and retry')
+
+    @classmethod
+    def _inference_conflict(cls):
+        return Conflict('Pairs implied by the judgments kept being judged by someone else meanwhile, '
+                        'nothing was saved, retry')
+
+    @classmethod
+    def _apply_update(cls, mark_dict, data):
+        """
+        Updates the mark inside the current transaction, returns an error if someone else changed it meanwhile.
+        """
+        conflict = Conflict(f'Pair mark with id {mark_dict["pairing_mark_id"]} was changed by someone else, '
+                            f'reload it and retry')
+        if data.get('version') not in (None, mark_dict['version']):
+            return None, conflict
+        if not cls._update_versioned(
+            (cls.event_id == mark_dict['event_id']) & (cls.pairing_mark_id == mark_dict['pairing_mark_id']),
+            mark_dict['version'], data
+        ):
+            return None, conflict
+        after = {key: data.get(key, mark_dict[key]) if key in cls.update_simple_fields else mark_dict[key]
+                 for key in cls.tracked_items_list}
+        cls._track_changes([(mark_dict, after)])
+        return None
 
     @classmethod
     def update(cls, data):
-        mark_dict = cls.get_mark_by_id(data['pairing_mark_id'])
+        mark_dict = cls.get_mark_by_id(data['pairing_mark_id'], data['event_id'])
 
         if mark_dict is None:
             return None, f'Pair mark with id {data["pairing_mark_id"]} was not found'
@@ -197,21 +652,127 @@ class PairingMark(EntityBase):
         if not cls._is_update_fields(data):
             return mark_dict
 
-        mark = cls.from_dict(mark_dict)
-        mark._update_simple_fields(data)
-        mark_dict = mark.to_dict()
-        return mark_dict
+        with db.auto_commit():
+            error = cls._apply_update(mark_dict, data)
+        if error is not None:
+            return error
+        return cls.get_mark_by_id(mark_dict['pairing_mark_id'], mark_dict['event_id'])
 
     @classmethod
-    def delete(cls, mark_id):
-        mark_dict = cls.get_mark_by_id(mark_id)
+    def delete(cls, mark_id, event_id):
+        mark_dict = cls.get_mark_by_id(mark_id, event_id)
         if mark_dict:
-            cls._delete(mark_dict)
+            with db.auto_commit():
+                cls.query.filter_by(pairing_mark_id=mark_id, event_id=mark_dict['event_id']).delete()
+                cls._track_changes([(mark_dict, None)])
             return mark_dict
         return None, f'Pairing mark with id {mark_id} was not found'
 
+    @classmethod
+    def _delete_tracked(cls, condition):
+        deleted = [cls._tracked_dict(row) for row in db.session.execute(
+            cls.__table__.delete().where(condition).returning(*[getattr(cls, key) for key in cls.tracked_items_list])
+        )]
+        cls._track_changes([(mark_dict, None) for mark_dict in deleted])
+        for key in {(mark_dict['event_id'], mark_dict['staff_id'], mark_dict['criteria_id']) for mark_dict in deleted}:
+            cls.ordering_graphs.pop(key, None)
+        return len(deleted)
+
     @classmethod
     def delete_by_solution(cls, solution_id):
-        marks = cls.get_marks_by_solution(solution_id)
-        for mark in marks:
-            cls._delete(mark)
+        """
+        Deletes pairs of the solution and its derived rows inside the current transaction, returns counts by table.
+        """
+        deleted = OrderedDict([(cls.__tablename__, cls._delete_tracked(cls._solution_filter(solution_id)))])
+        deleted.update(PairingStanding.delete_by_solution(solution_id))
+        deleted.update(SolutionRating.delete_by_solution(solution_id))
+        return deleted
+
+    @classmethod
+    def delete_by_staff(cls, staff_id):
+        deleted = OrderedDict([(cls.__tablename__, cls._delete_tracked(cls.staff_id == staff_id))])
+        deleted[PairingProgress.__tablename__] = PairingProgress.query.filter_by(staff_id=staff_id).delete(
+            synchronize_session=False
+        )
+        return deleted
+
+    @classmethod
+    def delete_by_event(cls, event_id):
+        deleted = OrderedDict([
+            (entity.__tablename__, entity.query.filter_by(event_id=event_id).delete(synchronize_session=False))
+            for entity in (cls, PairingProgress, PairingStanding, SolutionRating)
+        ])
+        cls.evict_caches(event_id)
+        return deleted
+
+    @classmethod
+    def evict_caches(cls, event_id):
+        """
+        Drops ordering graphs and the comparison store of the event from memory of the worker.
+        """
+        for key in [key for key in cls.ordering_graphs if key[0] == event_id]:
+            cls.ordering_graphs.pop(key)
+        cls.comparison_stores.pop(event_id)
+
+    @classmethod
+    def partition_name(cls, event_id):
+        return f'{cls.__tablename__}_{int(event_id)}'
+
+    @classmethod
+    def create_partition(cls, event_id, connection=None):
+        (connection or db.session).execute(text(
+            f'CREATE TABLE IF NOT EXISTS {cls.partition_name(event_id)} PARTITION OF {cls.__tablename__} '
+            f'FOR VALUES IN ({int(event_id)})'
+        ))
+
+    @classmethod
+    def _detach_concurrently(cls, partition_name):
+        """
+        Detaches the partition without blocking marking in other events. DETACH ... CONCURRENTLY can not run inside
+        a transaction, so the session transaction is committed first. A detach interrupted halfway is finalized.
+        """
+        db.session.commit()
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            pending = connection.execute(text(
+                'SELECT inhdetachpending FROM pg_inherits WHERE inhrelid = to_regclass(:name)'
+            ), dict(name=partition_name)).scalar()
+            if pending is not None:
+                connection.execute(text(f'ALTER TABLE {cls.__tablename__} DETACH PARTITION {partition_name} '
+                                        f'{"FINALIZE" if pending else "CONCURRENTLY"}'))
+
+    @classmethod
+    def drop_partition(cls, event_id):
+        """
+        Drops the emptied partition of a deleted event, it is detached first so that only the partition is locked.
+        """
+        partition_name = cls.partition_name(event_id)
+        cls._detach_concurrently(partition_name)
+        with db.auto_commit():
+            db.session.execute(text(f'DROP TABLE IF EXISTS {partition_name}'))
+        cls.evict_caches(event_id)
+
+    @classmethod
+    def detach_partition(cls, event_id):
+        """
+        Moves pairing marks of the event out of pairing_mark into a standalone archive table and returns its name.
+        Standings, progress and ratings of the event are kept.
+        """
+        partition_name = cls.partition_name(event_id)
+        archive_name = f'{cls.__tablename__}_archive_{int(event_id)}'
+        if not db.session.execute(text('SELECT to_regclass(:name)'), dict(name=partition_name)).scalar():
+            return None, f'Event {event_id} has no pairing mark partition'
+        cls._detach_concurrently(partition_name)
+        with db.auto_commit():
+            db.session.execute(text(f'ALTER TABLE {partition_name} RENAME TO {archive_name}'))
+            foreign_keys = db.session.execute(text(
+                "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"
+            ), dict(name=archive_name)).scalars().all()
+            for foreign_key in foreign_keys:
+                db.session.execute(text(f'ALTER TABLE {archive_name} DROP CONSTRAINT "{foreign_key}"'))
+        cls.evict_caches(event_id)
+        return archive_name
+
+
+@event.listens_for(Event, 'after_insert')
+def create_event_partition(mapper, connection, target):
+    PairingMark.create_partition(target.event_id, connection)
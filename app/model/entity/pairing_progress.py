@@ -0,0 +1,50 @@
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.model.db import db
+from .entity_base import EntityBase
+
+
+class PairingProgress(EntityBase):
+    __tablename__ = 'pairing_progress'
+
+    staff_id = Column(Integer, ForeignKey('staff.id'), primary_key=True)
+    event_id = Column(Integer, ForeignKey('Event.event_id'), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    remaining = Column(Integer, nullable=False, default=0)
+
+    update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
+
+    serialize_items_list = ['staff_id', 'event_id', 'total', 'remaining', 'update_date']
+
+    @classmethod
+    def get_progress(cls, staff_id, event_id):
+        return cls.dict_item(cls.query.filter_by(staff_id=staff_id, event_id=event_id).first())
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Adds (total, remaining) deltas keyed by (staff_id, event_id) inside the current transaction.
+        """
+        rows = [dict(staff_id=staff_id, event_id=event_id, total=total, remaining=remaining, update_date=cls.now())
+                for (staff_id, event_id), (total, remaining) in deltas.items() if total or remaining]
+        if not rows:
+            return
+        statement = insert(cls.__table__).values(rows)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['staff_id', 'event_id'],
+            set_={'total': cls.total + statement.excluded.total,
+                  'remaining': cls.remaining + statement.excluded.remaining,
+                  'update_date': statement.excluded.update_date}
+        ))
+
+    @classmethod
+    def rebuild(cls, event_id):
+        from .pairing_mark import PairingMark
+
+        with db.auto_commit():
+            cls.query.filter_by(event_id=event_id).delete()
+            counts = db.session.query(
+                PairingMark.staff_id, func.count(), func.count().filter(PairingMark.score == -1)
+            ).filter(PairingMark.event_id == event_id).group_by(PairingMark.staff_id)
+            cls.apply_deltas({(staff_id, event_id): (total, remaining) for staff_id, total, remaining in counts})
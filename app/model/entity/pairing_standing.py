@@ -0,0 +1,106 @@
+from collections import OrderedDict
+
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.model.db import db
+from .entity_base import EntityBase
+
+
+class PairingStanding(EntityBase):
+    __tablename__ = 'pairing_standing'
+
+    event_id = Column(Integer, ForeignKey('Event.event_id'), primary_key=True)
+    criteria_id = Column(Integer, ForeignKey('criteria.criteria_id'), primary_key=True)
+    solution_id = Column(Integer, ForeignKey('solution.solution_id'), primary_key=True)
+    wins = Column(Integer, nullable=False, default=0)
+    draws = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    byes = Column(Integer, nullable=False, default=0, server_default='0')
+
+    update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
+
+    serialize_items_list = ['event_id', 'criteria_id', 'solution_id', 'wins', 'draws', 'losses', 'byes',
+                            'update_date']
+
+    counters = ['wins', 'draws', 'losses', 'byes']
+
+    @classmethod
+    def get_standings(cls, event_id):
+        return [cls.dict_item(standing) for standing in cls.query.filter_by(event_id=event_id).order_by(
+            cls.criteria_id, cls.wins.desc(), cls.draws.desc(), cls.solution_id
+        )]
+
+    @staticmethod
+    def outcomes(score):
+        """
+        Returns (wins, draws, losses) of the first solution of a pair for a pairing mark score.
+        """
+        return int(score == 2), int(score == 1), int(score == 0)
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Adds (wins, draws, losses[, byes]) deltas keyed by (event_id, criteria_id, solution_id) inside the current
+        transaction. Rows are written in key order so concurrent updates of the same solutions lock them
+        in the same order.
+        """
+        rows = [dict(dict.fromkeys(cls.counters, 0), event_id=event_id, criteria_id=criteria_id,
+                     solution_id=solution_id, update_date=cls.now(), **dict(zip(cls.counters, counts)))
+                for (event_id, criteria_id, solution_id), counts in sorted(deltas.items()) if any(counts)]
+        if not rows:
+            return
+        statement = insert(cls.__table__).values(rows)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['event_id', 'criteria_id', 'solution_id'],
+            set_={**{counter: getattr(cls, counter) + getattr(statement.excluded, counter) for counter in cls.counters},
+                  'update_date': statement.excluded.update_date}
+        ))
+
+    @classmethod
+    def delete_by_solution(cls, solution_id):
+        deleted = cls.query.filter_by(solution_id=solution_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
+
+    @classmethod
+    def _count_standings(cls, event_id):
+        from .pairing_mark import PairingMark
+
+        first_side, second_side = [
+            db.session.query(
+                PairingMark.criteria_id.label('criteria_id'),
+                getattr(PairingMark, solution_column).label('solution_id'),
+                (PairingMark.score == win_score).label('win'), (PairingMark.score == 1).label('draw'),
+                (PairingMark.score == 2 - win_score).label('loss')
+            ).filter((PairingMark.event_id == event_id) & (PairingMark.score != -1))
+            for solution_column, win_score in (('first_solution_id', 2), ('second_solution_id', 0))
+        ]
+        sides = first_side.union_all(second_side).subquery()
+        return {
+            (event_id, criteria_id, solution_id): (wins, draws, losses)
+            for criteria_id, solution_id, wins, draws, losses in db.session.query(
+                sides.c.criteria_id, sides.c.solution_id, func.count().filter(sides.c.win),
+                func.count().filter(sides.c.draw), func.count().filter(sides.c.loss)
+            ).group_by(sides.c.criteria_id, sides.c.solution_id)
+        }
+
+    @classmethod
+    def rebuild(cls, event_id):
+        """
+        Recounts standings of the event from pairing marks and returns how many stored rows were out of sync.
+        Byes are not derived from marks and are kept as they are.
+        """
+        counted = cls._count_standings(event_id)
+        standings = cls.query.filter_by(event_id=event_id).all()
+        stored = {(standing.event_id, standing.criteria_id, standing.solution_id):
+                  (standing.wins, standing.draws, standing.losses) for standing in standings}
+        byes = {(standing.event_id, standing.criteria_id, standing.solution_id): (0, 0, 0, standing.byes)
+                for standing in standings if standing.byes}
+        out_of_sync = sum(counted.get(key, (0, 0, 0)) != stored.get(key, (0, 0, 0))
+                          for key in counted.keys() | stored.keys())
+
+        with db.auto_commit():
+            cls.query.filter_by(event_id=event_id).delete()
+            cls.apply_deltas(counted)
+            cls.apply_deltas(byes)
+        return out_of_sync
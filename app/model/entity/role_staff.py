@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from os import environ as env
 from sqlalchemy import event
 from app.model.db import db
@@ -7,6 +8,11 @@ role_staff_table = db.Table('role_staff',
                             db.Column('role_id', db.Integer(), db.ForeignKey('role.role_id')))
 
 
+def delete_roles_by_staff(staff_id):
+    deleted = db.session.execute(role_staff_table.delete().where(role_staff_table.c.staff_id == staff_id)).rowcount
+    return OrderedDict([(role_staff_table.name, deleted)])
+
+
 @event.listens_for(role_staff_table, 'after_create')
 def create_all(*args, **kwargs):
     from ...admin import user_datastore
@@ -1,11 +1,22 @@
-from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+import math
 
-from app.model.db import seq
+from collections import Counter, OrderedDict
+
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, column, exists, func, literal, select, true
+from sqlalchemy.dialects.postgresql import array, insert
+from sqlalchemy.orm import aliased
+
+from app.model.db import db, seq
 from ..entity.criteria import Criteria
+from ..entity.event import Event
 from ..entity.mark import Mark
+from .normalized_score import NormalizedScore
 from .pairing_mark import PairingMark
+from .pairing_progress import PairingProgress
+from .pairing_standing import PairingStanding
 from .entity_base import EntityBase
 from ..relation.user_event import UserEvent
+from ...util.swiss import swiss_pairs
 
 
 class Solution(EntityBase):
@@ -22,7 +33,7 @@ class Solution(EntityBase):
     update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
     last_change_by_id = Column(Integer)
 
-    serialize_items_list = ['solution_id', 'user_event_id', 'url', 'description', 'create_date',
+    serialize_items_list = ['solution_id', 'event_id', 'user_event_id', 'url', 'description', 'create_date',
                             'update_date', 'last_change_by_id']
 
     update_fields = ['url', 'description', 'last_change_by_id']
@@ -36,6 +47,7 @@ class Solution(EntityBase):
 
     delete_relations_funcs = [
         Mark.delete_by_solution,
+        PairingMark.delete_by_solution,
     ]
 
     @classmethod
@@ -56,29 +68,270 @@ class Solution(EntityBase):
     def get_solutions_by_event(cls, event_id):
         return [cls.dict_item(item) for item in cls.query.filter_by(event_id=event_id)]
 
+    @classmethod
+    def get_event_ids(cls, solution_ids):
+        return sorted(event_id for event_id, in db.session.query(cls.event_id).filter(
+            cls.solution_id.in_(solution_ids)
+        ).distinct())
+
+    @classmethod
+    def add_score_aggregates(cls, solutions, normalization=None):
+        """
+        Adds scores aggregated per criteria to solution dicts, from precomputed normalized scores if
+        normalization is one of NormalizedScore.NORMALIZATIONS.
+        """
+        score = None if normalization is None else getattr(NormalizedScore, normalization)
+        aggregates = Mark.get_aggregates_by_solutions([solution['solution_id'] for solution in solutions], score)
+        return [OrderedDict([*solution.items(), *aggregates.get(
+            solution['solution_id'], OrderedDict([('score_aggregates', []), ('weighted_total', None)])
+        ).items()]) for solution in solutions]
+
     @classmethod
     def get_solutions_by_user(cls, user_id):
         user_event_ids = UserEvent.get_relation_ids_by_user(user_id)
         return [cls.get_solution_by_user_event(user_event_id) for user_event_id in user_event_ids]
 
     @classmethod
-    def create_all_pairs(cls, event_id, staff_id):
-        solutions = cls.get_solutions_by_event(event_id)
-        criterias = Criteria.get_criterias()
-        for criteria in criterias:
-            for i in range(len(solutions)):
-                for j in range(len(solutions) - i - 1):
-                    data = {
-                        'criteria_id': criteria['criteria_id'],
-                        'staff_id': staff_id,
-                        'event_id': event_id,
-                        'first_solution_id': solutions[i]['solution_id'],
-                        'second_solution_id': solutions[j + i + 1]['solution_id'],
-                        'score': -1,
-                        'comment': '',
-                        'last_change_by_id': staff_id
-                    }
-                    PairingMark.create(data)
+    def _insert_pairs(cls, event_id, pairs):
+        """
+        Inserts unmarked pairing marks for a query of (criteria_id, staff_id, low_solution_id, high_solution_id)
+        and returns how many were created.
+        """
+        pairs = pairs.subquery()
+        now = cls.now()
+        rows = db.session.query(
+            seq.next_value(), pairs.c.criteria_id, pairs.c.staff_id, literal(event_id), pairs.c.low_solution_id,
+            pairs.c.high_solution_id, pairs.c.low_solution_id, pairs.c.high_solution_id, literal(False), literal(-1),
+            literal(''), literal(now), literal(now), pairs.c.staff_id
+        )
+        columns = ['pairing_mark_id', 'criteria_id', 'staff_id', 'event_id', 'first_solution_id',
+                   'second_solution_id', 'low_solution_id', 'high_solution_id', 'is_reversed', 'score', 'comment',
+                   'create_date', 'update_date', 'last_change_by_id']
+        with db.auto_commit():
+            created = cls._save_pairs(event_id, insert(PairingMark.__table__).from_select(columns, rows.statement))
+        return created
+
+    @classmethod
+    def _save_pairs(cls, event_id, statement):
+        statement = statement.on_conflict_do_nothing(
+            index_elements=['event_id', 'staff_id', 'criteria_id', 'low_solution_id', 'high_solution_id']
+        ).returning(PairingMark.staff_id)
+        created = Counter(row.staff_id for row in db.session.execute(statement))
+        PairingProgress.apply_deltas({(staff_id, event_id): (count, count) for staff_id, count in created.items()})
+        return sum(created.values())
+
+    @classmethod
+    def _create_missing_pairs(cls, event_id, judges, solution_id=None):
+        event = Event.get_event_by_id(event_id)
+        if event is None or event['evaluation_method'] != Event.SIMPLE_EVALUATION:
+            return 0
+
+        first, second = aliased(cls), aliased(cls)
+        pairs = db.session.query(
+            judges.c.criteria_id, judges.c.staff_id, first.solution_id.label('low_solution_id'),
+            second.solution_id.label('high_solution_id')
+        ).select_from(first).join(
+            second, (second.event_id == first.event_id) & (first.solution_id < second.solution_id)
+        ).join(judges, true()).filter(first.event_id == event_id).filter(~exists().where(
+            (PairingMark.event_id == event_id)
+            & (PairingMark.staff_id == judges.c.staff_id)
+            & (PairingMark.criteria_id == judges.c.criteria_id)
+            & (PairingMark.low_solution_id == first.solution_id)
+            & (PairingMark.high_solution_id == second.solution_id)
+        ))
+        if solution_id is not None:
+            pairs = pairs.filter((first.solution_id == solution_id) | (second.solution_id == solution_id))
+        return cls._insert_pairs(event_id, pairs)
+
+    @classmethod
+    def create_all_pairs(cls, event_id, staff_id, criteria_id=None):
+        criteria_ids = Criteria.get_criteria_ids_by_event(event_id)
+        if criteria_id is not None:
+            criteria_ids = [criteria_id] if criteria_id in criteria_ids else []
+        judges = db.session.query(
+            literal(staff_id).label('staff_id'), Criteria.criteria_id.label('criteria_id')
+        ).filter(Criteria.criteria_id.in_(criteria_ids))
+        return cls._create_missing_pairs(event_id, judges.subquery())
+
+    @classmethod
+    def check_distribution(cls, event_id, staff_ids, redundancy):
+        event = Event.get_event_by_id(event_id)
+        if event is None:
+            return None, f'Event with id {event_id} was not found'
+        if event['evaluation_method'] == Event.BINARY_INSERTION_EVALUATION:
+            return None, 'Pairs of binary insertion events are created while marking'
+        if not 1 <= redundancy <= len(set(staff_ids)):
+            return None, 'Redundancy must be between 1 and the number of judges'
+        return None
+
+    @classmethod
+    def distribute_pairs(cls, event_id, staff_ids, redundancy=1, criteria_id=None, solution_id=None):
+        """
+        Splits the pairs of the event between judges so that every pair is judged by `redundancy` of them.
+        Pairs are numbered round by round (every solution appears once per round), each copy of that sequence
+        is cut into equal contiguous chunks, so judges get equal queues and see every solution equally often.
+        The redundancy is kept on the event to distribute pairs of solutions submitted later the same way.
+        """
+        error = cls.check_distribution(event_id, staff_ids, redundancy)
+        if error is not None:
+            return error
+        staff_ids = list(OrderedDict.fromkeys(staff_ids))
+
+        size = db.session.query(func.count(cls.solution_id)).filter(cls.event_id == event_id).scalar()
+        if size < 2:
+            return 0
+        total = size * (size - 1) // 2
+        positions = db.session.query(
+            cls.solution_id, (func.row_number().over(order_by=cls.solution_id) - 1).label('position')
+        ).filter(cls.event_id == event_id).subquery()
+        first, second = aliased(positions), aliased(positions)
+        numbered = db.session.query(
+            first.c.solution_id.label('low_solution_id'), second.c.solution_id.label('high_solution_id'),
+            (func.row_number().over(
+                order_by=[(first.c.position + second.c.position) % size, first.c.position]
+            ) - 1).label('pair_number')
+        ).join(second, first.c.position < second.c.position).subquery()
+        replicas = func.generate_series(0, redundancy - 1).alias('replica')
+        judged = db.session.query(func.count()).filter(
+            (PairingMark.event_id == event_id) & (PairingMark.criteria_id == Criteria.criteria_id)
+            & (PairingMark.low_solution_id == numbered.c.low_solution_id)
+            & (PairingMark.high_solution_id == numbered.c.high_solution_id)
+        ).scalar_subquery()
+        pairs = db.session.query(
+            Criteria.criteria_id,
+            array(staff_ids)[
+                (column('replica') * total + numbered.c.pair_number) * len(staff_ids) / (redundancy * total) + 1
+            ].label('staff_id'),
+            numbered.c.low_solution_id, numbered.c.high_solution_id
+        ).select_from(numbered).join(Criteria, true()).join(replicas, true()).filter(
+            (judged < redundancy) & Criteria.criteria_id.in_(Criteria.get_criteria_ids_by_event(event_id))
+        )
+        if criteria_id is not None:
+            pairs = pairs.filter(Criteria.criteria_id == criteria_id)
+        if solution_id is not None:
+            pairs = pairs.filter((numbered.c.low_solution_id == solution_id)
+                                 | (numbered.c.high_solution_id == solution_id))
+        Event.query.filter_by(event_id=event_id).update({'pair_redundancy': redundancy}, synchronize_session=False)
+        return cls._insert_pairs(event_id, pairs)
+
+    @staticmethod
+    def _swiss_rounds(event, solutions):
+        return event['swiss_rounds'] or math.ceil(math.log2(max(solutions, 2))) + 1
+
+    @classmethod
+    def is_swiss_round_due(cls, event):
+        """
+        Tells without locking whether create_swiss_round would start a round on its own: a round was started,
+        none of its pairs is left unmarked and the event has rounds left. Judges polling for pairs check it
+        first so that only the poll finishing a round takes the event lock.
+        """
+        event_id = event['event_id']
+        current_round = db.session.query(func.max(PairingMark.swiss_round)).filter(
+            PairingMark.event_id == event_id
+        ).scalar()
+        if not current_round or db.session.query(exists().where(
+            (PairingMark.event_id == event_id) & (PairingMark.swiss_round == current_round) & (PairingMark.score == -1)
+        )).scalar():
+            return False
+        solutions = db.session.query(func.count(cls.solution_id)).filter(cls.event_id == event_id).scalar()
+        return current_round < cls._swiss_rounds(event, solutions)
+
+    @classmethod
+    def create_swiss_round(cls, event_id, staff_ids=None, redundancy=1):
+        """
+        Creates pairs of the next swiss round once every pair of the current one is marked.
+        Solutions are paired by points from the event standings, judges of the previous round
+        keep judging when staff_ids are not given. The solution left out of an odd field gets a point
+        on every criteria as a bye.
+        """
+        event = Event.get_event_by_id(event_id)
+        if event is None:
+            return None, f'Event with id {event_id} was not found'
+        if event['evaluation_method'] != Event.SWISS_EVALUATION:
+            return None, f'Event with id {event_id} is not evaluated by swiss rounds'
+
+        with db.auto_commit():
+            # rounds of an event are created one at a time
+            db.session.execute(select(func.pg_advisory_xact_lock(event_id)))
+            current_round = db.session.query(func.max(PairingMark.swiss_round)).filter(
+                PairingMark.event_id == event_id
+            ).scalar() or 0
+            round_marks = PairingMark.query.filter_by(event_id=event_id, swiss_round=current_round)
+            if current_round and round_marks.filter_by(score=-1).first() is not None:
+                return 0
+            if staff_ids is None:
+                staff_ids = [staff_id for staff_id, in round_marks.with_entities(PairingMark.staff_id).distinct()
+                             .order_by(PairingMark.staff_id)]
+                judges = round_marks.with_entities(func.count().label('judges')).group_by(
+                    PairingMark.criteria_id, PairingMark.low_solution_id, PairingMark.high_solution_id
+                ).subquery()
+                redundancy = db.session.query(func.max(judges.c.judges)).scalar()
+            staff_ids = list(OrderedDict.fromkeys(staff_ids))
+            if not staff_ids:
+                return 0
+
+            points = {solution_id: 0 for solution_id, in db.session.query(cls.solution_id).filter_by(
+                event_id=event_id
+            )}
+            if current_round >= cls._swiss_rounds(event, len(points)):
+                return 0
+            for solution_id, solution_points in db.session.query(
+                PairingStanding.solution_id,
+                func.sum(PairingStanding.wins + PairingStanding.draws / 2.0 + PairingStanding.byes)
+            ).filter(PairingStanding.event_id == event_id).group_by(PairingStanding.solution_id):
+                if solution_id in points:
+                    points[solution_id] = solution_points
+            byes = dict(db.session.query(PairingStanding.solution_id, func.max(PairingStanding.byes)).filter(
+                PairingStanding.event_id == event_id
+            ).group_by(PairingStanding.solution_id))
+            played = set(db.session.query(PairingMark.low_solution_id, PairingMark.high_solution_id).filter(
+                (PairingMark.event_id == event_id) & (PairingMark.swiss_round != None)
+            ).distinct())
+            pairs, bye = swiss_pairs(points, played, byes)
+            if not pairs:
+                return 0
+
+            now = cls.now()
+            redundancy = min(redundancy or 1, len(staff_ids))
+            criteria_ids = Criteria.get_criteria_ids_by_event(event_id)
+            if bye is not None:
+                PairingStanding.apply_deltas({(event_id, criteria_id, bye): (0, 0, 0, 1)
+                                              for criteria_id in criteria_ids})
+            rows = [dict(pairing_mark_id=seq.next_value(), criteria_id=criteria_id,
+                         staff_id=staff_ids[(replica * len(pairs) + k) * len(staff_ids) // (redundancy * len(pairs))],
+                         event_id=event_id, first_solution_id=low_solution_id, second_solution_id=high_solution_id,
+                         low_solution_id=low_solution_id, high_solution_id=high_solution_id, is_reversed=False,
+                         score=-1, comment='', swiss_round=current_round + 1, create_date=now, update_date=now,
+                         last_change_by_id=None)
+                    for k, (low_solution_id, high_solution_id) in enumerate(pairs)
+                    for replica in range(redundancy) for criteria_id in criteria_ids]
+            if not rows:
+                return 0
+            return cls._save_pairs(event_id, insert(PairingMark.__table__).values(rows))
+
+    @classmethod
+    def create_pairs_for_solution(cls, event_id, solution_id):
+        """
+        Creates pairs of a solution submitted after pairs of the event were created, distributed between
+        the event judges when the event pairs were distributed or for every judge otherwise.
+        """
+        event = Event.get_event_by_id(event_id)
+        if event is None or event['evaluation_method'] != Event.SIMPLE_EVALUATION:
+            return 0
+        if event['pair_redundancy'] is not None:
+            staff_ids = [staff_id for staff_id, in db.session.query(PairingMark.staff_id).filter(
+                PairingMark.event_id == event_id
+            ).distinct().order_by(PairingMark.staff_id)]
+            if not staff_ids:
+                return 0
+            return cls.distribute_pairs(event_id, staff_ids, min(event['pair_redundancy'], len(staff_ids)),
+                                        solution_id=solution_id)
+
+        judges = db.session.query(PairingMark.staff_id, PairingMark.criteria_id).filter(
+            (PairingMark.event_id == event_id)
+            & PairingMark.criteria_id.in_(Criteria.get_criteria_ids_by_event(event_id))
+        ).distinct().subquery()
+        return cls._create_missing_pairs(event_id, judges, solution_id)
 
     @classmethod
     def create(cls, data):
@@ -90,6 +343,7 @@ class Solution(EntityBase):
                        url=data['url'], description=data['description'], last_change_by_id=data['last_change_by_id'])
         solution.add()
         solution_dict = solution.to_dict()
+        cls.create_pairs_for_solution(data['event_id'], solution_dict['solution_id'])
 
         return solution_dict
 
@@ -113,7 +367,18 @@ class Solution(EntityBase):
     def delete(cls, solution_id):
         solution_dict = cls.get_solution_by_id(solution_id)
         if solution_dict:
-            cls._delete(solution_dict)
+            solution_dict['deleted'] = cls._delete_cascade(solution_dict)
             return solution_dict
         return None, f'Solution with id {solution_id} was not found'
 
+    @classmethod
+    def delete_by_event(cls, event_id):
+        """
+        Deletes solutions of the event with their marks and registrations inside the current transaction.
+        """
+        deleted = PairingMark.delete_by_event(event_id)
+        deleted.update(Mark.delete_by_solutions(select(cls.solution_id).where(cls.event_id == event_id)))
+        deleted[cls.__tablename__] = cls.query.filter_by(event_id=event_id).delete(synchronize_session=False)
+        deleted.update(UserEvent.delete_relations_by_event(event_id))
+        return deleted
+
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+
+from sqlalchemy import Column, DateTime, Float, Integer, ForeignKey, Index, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.model.db import db
+from .entity_base import EntityBase
+
+
+class SolutionRating(EntityBase):
+    __tablename__ = 'solution_rating'
+
+    INITIAL_RATING = 1500.0
+    K_FACTOR = 32.0
+    SCALE = 400.0
+
+    event_id = Column(Integer, ForeignKey('Event.event_id'), primary_key=True)
+    criteria_id = Column(Integer, ForeignKey('criteria.criteria_id'), primary_key=True)
+    solution_id = Column(Integer, ForeignKey('solution.solution_id'), primary_key=True)
+    rating = Column(Float, nullable=False, default=INITIAL_RATING)
+    games = Column(Integer, nullable=False, default=0)
+
+    update_date = Column(DateTime, default=EntityBase.now, onupdate=EntityBase.now)
+
+    idx_leaderboard = Index('idx_solution_rating_leaderboard', event_id, criteria_id, rating.desc())
+
+    serialize_items_list = ['event_id', 'criteria_id', 'solution_id', 'rating', 'games', 'update_date']
+
+    @classmethod
+    def get_ratings(cls, event_id):
+        return [cls.dict_item(rating) for rating in cls.query.filter_by(event_id=event_id).order_by(
+            cls.criteria_id, cls.rating.desc(), cls.solution_id
+        )]
+
+    @classmethod
+    def _play(cls, ratings, judgments):
+        """
+        Applies Elo updates for (event_id, criteria_id, first_solution_id, second_solution_id, score, sign)
+        judgments in order to the ratings dict of [rating, games] keyed by (event_id, criteria_id, solution_id).
+        sign -1 takes a judgment back by reverting its update at the current ratings, rebuild gives the exact values.
+        """
+        for event_id, criteria_id, first_solution_id, second_solution_id, score, sign in judgments:
+            first = ratings.setdefault((event_id, criteria_id, first_solution_id), [cls.INITIAL_RATING, 0])
+            second = ratings.setdefault((event_id, criteria_id, second_solution_id), [cls.INITIAL_RATING, 0])
+            expected = 1 / (1 + 10 ** ((second[0] - first[0]) / cls.SCALE))
+            delta = sign * cls.K_FACTOR * (score / 2 - expected)
+            first[0] += delta
+            second[0] -= delta
+            first[1] += sign
+            second[1] += sign
+
+    @classmethod
+    def _save(cls, ratings):
+        if not ratings:
+            return
+        statement = insert(cls.__table__).values([
+            dict(event_id=event_id, criteria_id=criteria_id, solution_id=solution_id, rating=rating, games=games,
+                 update_date=cls.now())
+            for (event_id, criteria_id, solution_id), (rating, games) in sorted(ratings.items())
+        ])
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['event_id', 'criteria_id', 'solution_id'],
+            set_={'rating': statement.excluded.rating, 'games': statement.excluded.games,
+                  'update_date': statement.excluded.update_date}
+        ))
+
+    @classmethod
+    def apply_judgments(cls, judgments):
+        """
+        Updates ratings of the judged solutions inside the current transaction, see _play for the judgments format.
+        Their rows are locked with FOR UPDATE while the new ratings are computed, in key order like the upsert
+        so that concurrent judgments of the same solutions cannot deadlock.
+        """
+        if not judgments:
+            return
+        keys = {(event_id, criteria_id, solution_id)
+                for event_id, criteria_id, first_solution_id, second_solution_id, _, _ in judgments
+                for solution_id in (first_solution_id, second_solution_id)}
+        ratings = {(rating.event_id, rating.criteria_id, rating.solution_id): [rating.rating, rating.games]
+                   for rating in db.session.query(cls.event_id, cls.criteria_id, cls.solution_id, cls.rating,
+                                                  cls.games).filter(
+                       tuple_(cls.event_id, cls.criteria_id, cls.solution_id).in_(keys)
+                   ).order_by(cls.event_id, cls.criteria_id, cls.solution_id).with_for_update()}
+        cls._play(ratings, judgments)
+        cls._save(ratings)
+
+    @classmethod
+    def delete_by_solution(cls, solution_id):
+        deleted = cls.query.filter_by(solution_id=solution_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
+
+    @classmethod
+    def rebuild(cls, event_id):
+        """
+        Replays every marked judgment of the event in the order they were made.
+        """
+        from .pairing_mark import PairingMark
+
+        judgments = db.session.query(
+            PairingMark.event_id, PairingMark.criteria_id, PairingMark.first_solution_id,
+            PairingMark.second_solution_id, PairingMark.score
+        ).filter((PairingMark.event_id == event_id) & (PairingMark.score != -1)).order_by(
+            PairingMark.update_date, PairingMark.pairing_mark_id
+        )
+        ratings = {}
+        cls._play(ratings, (tuple(judgment) + (1,) for judgment in judgments))
+        with db.auto_commit():
+            cls.query.filter_by(event_id=event_id).delete()
+            cls._save(ratings)
@@ -7,8 +7,11 @@ from sqlalchemy.dialects.postgresql import array_agg
 
 from app.model.db import db, seq
 from .entity_base import EntityBase
+from .job import Job
+from .mark import Mark
+from .pairing_mark import PairingMark
 from .person import Person
-from .role_staff import role_staff_table
+from .role_staff import delete_roles_by_staff, role_staff_table
 from ..relation.user_staff import UserStaff
 from ...util.functions import handle_error
 
@@ -40,7 +43,11 @@ class Staff(EntityBase, UserMixin):
     }
 
     delete_relations_funcs = [
-        UserStaff.delete_relations_by_staff
+        UserStaff.delete_relations_by_staff,
+        Mark.delete_by_staff,
+        PairingMark.delete_by_staff,
+        Job.delete_by_staff,
+        delete_roles_by_staff
     ]
 
     @classmethod
@@ -171,7 +178,7 @@ class Staff(EntityBase, UserMixin):
     def delete(cls, id):
         staff_dict = cls.get_staff_by_id(id)
         if staff_dict:
-            cls._delete(staff_dict)
+            staff_dict['deleted'] = cls._delete_cascade(staff_dict)
             Person.delete(staff_dict['person']['person_id'])
             return staff_dict
         return None, f'Staff with id = {id} was not found'
@@ -1,2 +1,3 @@
+from .event_criteria import EventCriteria
 from .user_event import UserEvent
 from .user_staff import UserStaff
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from sqlalchemy import Column, Integer, Index
+
+from .relation_base import RelationBase
+from app.model.db import db, seq
+
+
+class EventCriteria(RelationBase):
+    __tablename__ = 'event_criteria'
+
+    event_criteria_id = Column(Integer, seq, primary_key=True)
+    event_id = Column(Integer, nullable=False)
+    criteria_id = Column(Integer, nullable=False)
+
+    idx = Index('uq_event_criteria', event_id, criteria_id, unique=True)
+
+    serialize_items_list = ['event_criteria_id', 'event_id', 'criteria_id']
+
+    @classmethod
+    def get_relation(cls, event_id, criteria_id):
+        return cls.dict_item(cls.query.filter_by(event_id=event_id, criteria_id=criteria_id).first())
+
+    @classmethod
+    def get_relations_by_event(cls, event_id):
+        return [relation.to_dict() for relation in
+                cls.query.filter_by(event_id=event_id).order_by(cls.criteria_id).all()]
+
+    @classmethod
+    def create_by_id(cls, event_id, criteria_id):
+        relation_dict = cls.get_relation(event_id, criteria_id)
+        if relation_dict is None:
+            relation = cls(event_id=event_id, criteria_id=criteria_id)
+            relation.add()
+            relation_dict = relation.to_dict()
+        return relation_dict
+
+    @classmethod
+    def update_by_event(cls, event_id, old_ids, new_ids):
+        to_add_ids, to_delete_ids = cls._analyze_update(old_ids, new_ids)
+        with db.auto_commit():
+            if to_delete_ids:
+                cls.query.filter(
+                    (cls.event_id == event_id) & cls.criteria_id.in_(to_delete_ids)
+                ).delete(synchronize_session=False)
+            db.session.add_all([cls(event_id=event_id, criteria_id=criteria_id) for criteria_id in sorted(to_add_ids)])
+
+    @classmethod
+    def delete_relation(cls, event_id, criteria_id):
+        relation_dict = cls.get_relation(event_id, criteria_id)
+        if not relation_dict:
+            return None, f'Relation with event id = {event_id} and criteria id = {criteria_id} was not found'
+        relation = cls.from_dict(relation_dict)
+        relation.delete_self()
+        return relation_dict
+
+    @classmethod
+    def delete_relations_by_event(cls, event_id):
+        deleted = cls.query.filter_by(event_id=event_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
+
+    @classmethod
+    def delete_relations_by_criteria(cls, criteria_id):
+        deleted = cls.query.filter_by(criteria_id=criteria_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from sqlalchemy import Column, Integer, String, Index
 
 from .relation_base import RelationBase
@@ -75,12 +76,10 @@ class UserEvent(RelationBase):
 
     @classmethod
     def delete_relations_by_user(cls, user_id):
-        relation_dicts = cls.get_relations_by_user(user_id)
-        for relation_dict in relation_dicts:
-            cls.__delete_relation(relation_dict)
+        deleted = cls.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
 
     @classmethod
     def delete_relations_by_event(cls, event_id):
-        relation_dicts = cls.get_relations_by_event(event_id)
-        for relation_dict in relation_dicts:
-            cls.__delete_relation(relation_dict)
+        deleted = cls.query.filter_by(event_id=event_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
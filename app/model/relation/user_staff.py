@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from sqlalchemy import Column, Integer, String, Index
 
 from .relation_base import RelationBase
@@ -76,15 +77,13 @@ class UserStaff(RelationBase):
 
     @classmethod
     def delete_relations_by_user(cls, user_id):
-        relation_dicts = cls.get_relations_by_user(user_id)
-        for relation_dict in relation_dicts:
-            cls.__delete_relation(relation_dict)
+        deleted = cls.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
 
     @classmethod
     def delete_relations_by_staff(cls, staff_id):
-        relation_dicts = cls.get_relations_by_staff(staff_id)
-        for relation_dict in relation_dicts:
-            cls.__delete_relation(relation_dict)
+        deleted = cls.query.filter_by(staff_id=staff_id).delete(synchronize_session=False)
+        return OrderedDict([(cls.__tablename__, deleted)])
 
 
 
@@ -203,8 +203,7 @@ def get_bot_start_link(user_id):
 
 
 def get_data_frame_from_query(query):
-    compiled = query.statement.compile(query.session.bind)
-    return pd.read_sql(compiled.string, query.session.bind, params=compiled.params)
+    return pd.DataFrame(query.all(), columns=[column['name'] for column in query.column_descriptions])
 
 
 def get_data_frame_from_query_string(query, params=None):
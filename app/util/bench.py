@@ -0,0 +1,129 @@
+import random
+import time
+import uuid
+
+import numpy as np
+
+from collections import OrderedDict
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from ..model.db import db
+from ..model.entity.criteria import Criteria
+from ..model.entity.event import Event
+from ..model.entity.pairing_mark import PairingMark
+from ..model.entity.solution import Solution
+from ..model.entity.staff import Staff
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(db.engine, 'before_cursor_execute', self)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(db.engine, 'before_cursor_execute', self)
+
+
+def kendall_tau(truth, ranking):
+    """
+    Rank correlation of the solutions order in the ranking with the ground truth order, 1 means the same order.
+    """
+    size = len(ranking)
+    if size < 2:
+        return 1.0
+    truth_positions = {solution_id: position for position, solution_id in enumerate(truth)}
+    positions = np.array([truth_positions[solution_id] for solution_id in ranking])
+    agreements = np.sign(np.subtract.outer(positions, positions).T)[np.triu_indices(size, 1)]
+    return float(agreements.sum() / (size * (size - 1) / 2))
+
+
+def _judge(truth_quality, pair, noise, rng):
+    score = 2 if truth_quality[pair['first_solution_id']] > truth_quality[pair['second_solution_id']] else 0
+    return 2 - score if rng.random() < noise else score
+
+
+def _seed(method, solutions, judges, rng):
+    tag = uuid.uuid4().hex[:8]
+    criteria = Criteria.create(dict(name=f'bench {tag}', description=None, minimum=0, maximum=2))
+    now = Event.now()
+    event_dict = Event.create(dict(name=f'bench {method} {tag}', date_start=now, date_end=now + timedelta(days=1),
+                                   evaluation_method=method, criteria_ids=[criteria['criteria_id']]))
+    with db.auto_commit():
+        staff = [Staff(email=f'bench-{tag}-{i}@bench.local', password='', active=False) for i in range(judges)]
+        items = [Solution(event_id=event_dict['event_id'], url=f'bench://{tag}/{i}') for i in range(solutions)]
+        db.session.add_all(staff + items)
+    staff_ids = [judge.id for judge in staff]
+    solution_ids = [item.solution_id for item in items]
+    quality = dict(zip(solution_ids, rng.sample(range(solutions), solutions)))
+    return event_dict['event_id'], criteria['criteria_id'], staff_ids, quality
+
+
+def _cleanup(event_id, criteria_id, staff_ids):
+    Event.delete(event_id)
+    for staff_id in staff_ids:
+        Staff._delete_cascade({'id': staff_id})
+    Criteria.delete(criteria_id)
+
+
+def bench_method(method, solutions, judges, noise=0.0, redundancy=1, seed=0, keep=False):
+    """
+    Runs a marking session of synthetic judges answering by a hidden ground truth ranking through the
+    real pair creation, pair reservation and marking code and measures what it cost.
+    """
+    rng = random.Random(seed)
+    event_id, criteria_id, staff_ids, quality = _seed(method, solutions, judges, rng)
+    try:
+        started = time.perf_counter()
+        with QueryCounter() as setup_queries:
+            if method == Event.SIMPLE_EVALUATION:
+                for staff_id in staff_ids:
+                    Solution.create_all_pairs(event_id, staff_id)
+            elif method == Event.SWISS_EVALUATION:
+                Solution.create_swiss_round(event_id, staff_ids, redundancy)
+        setup_seconds = time.perf_counter() - started
+
+        # judges take turns until none of them gets a pair, swiss rounds are created by whoever asks first
+        latencies, queries, implied = [], 0, 0
+        judged = True
+        while judged:
+            judged = False
+            for staff_id in staff_ids:
+                started = time.perf_counter()
+                with QueryCounter() as counter:
+                    pair = PairingMark.get_pair_for_marking(staff_id, event_id)
+                    if not pair or 'pairing_mark_id' not in pair:
+                        continue
+                    _, mark_list = PairingMark.update_tree(dict(
+                        pair, score=_judge(quality, pair, noise, rng), comment='', last_change_by_id=staff_id
+                    ))
+                latencies.append(time.perf_counter() - started)
+                queries += counter.count
+                implied += len(mark_list)
+                judged = True
+
+        ranking = [item['solution_id'] for item in PairingMark.get_ranking(event_id)['ranking']]
+        truth = sorted(quality, key=quality.get, reverse=True)
+        return OrderedDict([
+            ('evaluation_method', method),
+            ('judgments', len(latencies)),
+            ('all_pairs', solutions * (solutions - 1) // 2 * judges),
+            ('implied_marks', implied),
+            ('queries_per_judgment', queries / len(latencies) if latencies else 0.0),
+            ('setup_queries', setup_queries.count),
+            ('setup_seconds', setup_seconds),
+            ('p50_ms', float(np.percentile(latencies, 50)) * 1000 if latencies else 0.0),
+            ('p99_ms', float(np.percentile(latencies, 99)) * 1000 if latencies else 0.0),
+            ('kendall_tau', kendall_tau(truth, ranking))
+        ])
+    finally:
+        if not keep:
+            _cleanup(event_id, criteria_id, staff_ids)
+
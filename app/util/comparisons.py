@@ -0,0 +1,64 @@
+import numpy as np
+
+UNJUDGED = -1
+
+
+class ComparisonStore:
+    """
+    Pairing mark scores of one event kept as int8 matrices per (criteria, staff) over a dense solution index.
+
+    Cell [i, j] holds the score of solution i against solution j with pairing mark semantics
+    (2 - i is better, 1 - equal, 0 - j is better) and [j, i] holds its complement, -1 marks unjudged pairs.
+    Rankings computed from the scores can be kept in `rankings`, they are dropped whenever scores are set.
+    """
+
+    def __init__(self, solution_ids):
+        self.solution_ids = np.array(sorted(solution_ids), dtype=np.int64)
+        self.matrices = {}
+        self.judged = 0
+        self.rankings = {}
+
+    def _indices(self, solution_ids):
+        indices = np.searchsorted(self.solution_ids, solution_ids)
+        known = (indices < len(self.solution_ids))
+        known[known] = self.solution_ids[indices[known]] == solution_ids[known]
+        return indices if known.all() else None
+
+    def _matrix(self, criteria_id, staff_id):
+        key = (criteria_id, staff_id)
+        if key not in self.matrices:
+            size = len(self.solution_ids)
+            self.matrices[key] = np.full((size, size), UNJUDGED, dtype=np.int8)
+        return self.matrices[key]
+
+    def set_scores(self, criteria_id, staff_id, low, high, low_scores):
+        """
+        Stores scores of the low solutions against the high ones given as arrays of canonical pairs.
+        Returns False without storing anything if the pairs reference solutions missing from the index.
+        """
+        low_indices, high_indices = self._indices(low), self._indices(high)
+        if low_indices is None or high_indices is None:
+            return False
+        matrix = self._matrix(criteria_id, staff_id)
+        self.rankings.clear()
+        self.judged += int((low_scores != UNJUDGED).sum() - (matrix[low_indices, high_indices] != UNJUDGED).sum())
+        matrix[low_indices, high_indices] = low_scores
+        matrix[high_indices, low_indices] = np.where(low_scores == UNJUDGED, UNJUDGED, 2 - low_scores)
+        return True
+
+    def criteria_ids(self):
+        return sorted({criteria_id for (criteria_id, _), matrix in self.matrices.items()
+                       if (matrix != UNJUDGED).any()})
+
+    def counts(self, criteria_ids):
+        """
+        Sums judgments of every judge on the given criteria into (wins, draws) matrices of shape (size, size),
+        where wins[i, j] is how many times i beat j and draws is symmetric.
+        """
+        size = len(self.solution_ids)
+        wins, draws = np.zeros((size, size)), np.zeros((size, size))
+        for (criteria_id, _), matrix in self.matrices.items():
+            if criteria_id in criteria_ids:
+                wins += matrix == 2
+                draws += matrix == 1
+        return wins, draws
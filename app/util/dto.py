@@ -228,7 +228,12 @@ class EventDto:
         'name': fields.String(required=True, description='Event name'),
         'date_start': fields.DateTime(required=True, description='Event start date'),
         'date_end': fields.DateTime(required=True, description='Event end date'),
-        'evaluation_method': fields.String(description='Method of event evaluation (default to "simple")')
+        'evaluation_method': fields.String(description='Method of event evaluation: "simple", "binary_insertion" '
+                                                       'or "swiss" (default to "simple")'),
+        'swiss_rounds': NullableInteger(description='Amount of rounds of the swiss evaluation (default to '
+                                                    'log2 of the solutions amount + 1)'),
+        'criteria_ids': fields.List(fields.Integer, description='Criteria the event is evaluated by (default to '
+                                                                'every criteria on creation)')
     })
 
     event_in_update = api.model('event_in_update', {
@@ -236,7 +241,12 @@ class EventDto:
         'name': fields.String(required=True, description='Event name'),
         'date_start': fields.DateTime(required=True, description='Event start date'),
         'date_end': fields.DateTime(required=True, description='Event end date'),
-        'evaluation_method': fields.String(description='Method of event evaluation (default to "simple")')
+        'evaluation_method': fields.String(description='Method of event evaluation: "simple", "binary_insertion" '
+                                                       'or "swiss" (default to "simple")'),
+        'swiss_rounds': NullableInteger(description='Amount of rounds of the swiss evaluation (default to '
+                                                    'log2 of the solutions amount + 1)'),
+        'criteria_ids': fields.List(fields.Integer, description='Criteria the event is evaluated by (default to '
+                                                                'every criteria on creation)')
     })
 
     event_out = api.model('event_out', {
@@ -244,7 +254,12 @@ class EventDto:
         'name': fields.String(required=True, description='Event name'),
         'date_start': fields.DateTime(required=True, description='Event start date'),
         'date_end': fields.DateTime(required=True, description='Event end date'),
-        'evaluation_method': fields.String(required=True, description='Method of event evaluation (default to "simple")'),
+        'evaluation_method': fields.String(required=True,
+                                           description='Method of event evaluation: "simple", "binary_insertion" '
+                                                       'or "swiss" (default to "simple")'),
+        'swiss_rounds': NullableInteger(description='Amount of rounds of the swiss evaluation'),
+        'pair_redundancy': NullableInteger(description='Amount of judges every pair is distributed to, empty when '
+                                                       'every judge gets all pairs'),
         'create_date': fields.DateTime(required=True, description='Event create date'),
         'update_date': fields.DateTime(required=True, description='Last update date')
     })
@@ -254,6 +269,23 @@ class EventDto:
         'count': fields.Integer(required=True, description='Full amount of events in DB')
     })
 
+    event_criteria_in = api.model('event_criteria_in', {
+        'event_id': fields.Integer(required=True, description='Event unique identifier'),
+        'criteria_ids': fields.List(fields.Integer, required=True, description='Criteria the event is evaluated by')
+    })
+
+    event_results = api.model('event_results', {
+        'event_id': fields.Integer(required=True, description='Event identifier'),
+        'create_date': fields.DateTime(required=True, description='Date the event was finalized'),
+        'solutions': fields.Raw(description='Solutions with their marks and pairing marks'),
+        'ranking': fields.Raw(description='Ranking of the solutions by pairing marks'),
+        'standings': fields.Raw(description='Wins, draws and losses of the solutions per criteria'),
+        'ratings': fields.Raw(description='Ratings of the solutions per criteria'),
+        'criteria': fields.Raw(description='Amount, average, minimum and maximum of marks per criteria and solution'),
+        'mark_counts': fields.Raw(description='Amounts of marks, pairing marks and judged pairing marks'),
+        'aggregates': fields.Raw(description='Solutions with score aggregates per normalization, raw ones included')
+    })
+
 
 class UserDto:
     api = Namespace('user', description='user operations')
@@ -367,7 +399,8 @@ class CriteriaDto:
         'name': fields.String(required=True, description='Criteria name'),
         'description': NullableString(description='Criteria description'),
         'minimum': fields.Integer(required=True, description='Criteria minimum score'),
-        'maximum': fields.Integer(required=True, description='Criteria maximum score')
+        'maximum': fields.Integer(required=True, description='Criteria maximum score'),
+        'weight': fields.Float(description='Weight of the criteria in solution totals, 1 by default')
     })
 
     criteria_update_in = api.model('criteria_update_in', {
@@ -375,7 +408,8 @@ class CriteriaDto:
         'name': fields.String(required=True, description='Criteria name'),
         'description': NullableString(description='Criteria description'),
         'minimum': fields.Integer(required=True, description='Criteria minimum score'),
-        'maximum': fields.Integer(required=True, description='Criteria maximum score')
+        'maximum': fields.Integer(required=True, description='Criteria maximum score'),
+        'weight': fields.Float(description='Weight of the criteria in solution totals')
     })
 
     criteria_out = api.model('criteria_out', {
@@ -384,6 +418,7 @@ class CriteriaDto:
         'description': NullableString(description='Criteria description'),
         'minimum': fields.Integer(required=True, description='Criteria minimum score'),
         'maximum': fields.Integer(required=True, description='Criteria maximum score'),
+        'weight': fields.Float(required=True, description='Weight of the criteria in solution totals'),
         'create_date': fields.DateTime(required=True, description='Event create date'),
         'update_date': fields.DateTime(required=True, description='Last update date'),
         'last_change_by_id': fields.Integer(required=True, description='Person identifier who changed the last time')
@@ -395,6 +430,24 @@ class CriteriaDto:
     })
 
 
+class JobDto:
+    api = Namespace('job', description='Background job operations')
+
+    job_out = api.model('job_out', {
+        'job_id': fields.Integer(required=True, description='Job unique identifier'),
+        'name': fields.String(required=True, description='Job name'),
+        'params': fields.Raw(required=True, description='Job parameters'),
+        'status': fields.String(required=True, description='Job status: "pending", "running", "done" or "failed"'),
+        'progress': fields.Float(required=True, description='Completed part of the job from 0 to 1'),
+        'result': fields.Raw(description='Job result'),
+        'error': NullableString(description='Error message of the failed job'),
+        'staff_id': fields.Integer(description='Staff who started the job'),
+        'create_date': fields.DateTime(required=True, description='Job create date'),
+        'update_date': fields.DateTime(required=True, description='Last update date'),
+        'finish_date': fields.DateTime(description='Job finish date')
+    })
+
+
 class MarkDto:
     api = Namespace('mark', description='Mark operations')
 
@@ -408,7 +461,9 @@ class MarkDto:
     mark_update_in = api.model('mark_update_in', {
         'mark_id': fields.Integer(required=True, description='Mark unique identifier'),
         'score': fields.Integer(required=True, description='Score of the solution in this criteria'),
-        'comment': NullableString(description='Comment on the score')
+        'comment': NullableString(description='Comment on the score'),
+        'version': NullableInteger(description='Version of the mark the change is based on, the change is rejected '
+                                               'if the mark was changed since then')
     })
 
     mark_out = api.model('mark_out', {
@@ -418,11 +473,47 @@ class MarkDto:
         'staff_id': fields.Integer(required=True, description='Staff unique identifier'),
         'score': fields.Integer(required=True, description='Score of the solution in this criteria'),
         'comment': NullableString(description='Comment on the score'),
+        'version': fields.Integer(required=True, description='Version of the mark, grows with every change'),
         'create_date': fields.DateTime(required=True, description='Event create date'),
         'update_date': fields.DateTime(required=True, description='Last update date'),
         'last_change_by_id': fields.Integer(required=True, description='Person identifier who changed the last time')
     })
 
+    normalized_score_out = api.model('normalized_score_out', {
+        'staff_id': fields.Integer(required=True, description='Staff unique identifier'),
+        'criteria_id': fields.Integer(required=True, description='Criteria unique identifier'),
+        'solution_id': fields.Integer(required=True, description='Solution unique identifier'),
+        'score': fields.Integer(required=True, description='Score of the solution in this criteria'),
+        'z_score': fields.Float(required=True, description='Deviation of the score from the mean score of the staff '
+                                                           'in this criteria measured in standard deviations'),
+        'rank_score': fields.Float(required=True, description='Percentile of the score among scores of the staff '
+                                                              'in this criteria, from 0 to 1')
+    })
+
+    normalized_score_list = api.model('normalized_score_list', {
+        'event_id': fields.Integer(required=True, description='Event unique identifier'),
+        'update_date': fields.DateTime(description='Date the scores were computed'),
+        'scores': fields.List(fields.Nested(normalized_score_out), required=True,
+                              description='Scores of the event normalized per staff and criteria')
+    })
+
+    mark_batch_in = api.model('mark_batch_in', {
+        'marks': fields.List(fields.Nested(mark_create_in), required=True,
+                             description='List of marks to create or overwrite')
+    })
+
+    mark_batch_error_out = api.model('mark_batch_error_out', {
+        'index': fields.Integer(required=True, description='Position of the rejected mark in the batch'),
+        'solution_id': fields.Integer(required=True, description='Marked solution unique identifier'),
+        'criteria_id': fields.Integer(required=True, description='Marked criteria unique identifier'),
+        'error': fields.String(required=True, description='Reason the mark was rejected')
+    })
+
+    mark_batch_out = api.model('mark_batch_out', {
+        'marks': fields.List(fields.Nested(mark_out), description='List of created or overwritten marks'),
+        'errors': fields.List(fields.Nested(mark_batch_error_out), description='List of rejected marks')
+    })
+
 
 class PairingMarkDto:
     api = Namespace('pairing_mark', description='Mark operations with pairing method')
@@ -441,8 +532,27 @@ class PairingMarkDto:
         'first_solution_id': fields.Integer(required=True, description='First marked solution unique identifier'),
         'second_solution_id': fields.Integer(required=True, description='Second marked solution unique identifier'),
         'criteria_id': fields.Integer(required=True, description='Marked criteria unique identifier'),
+        'event_id': fields.Integer(required=True, description='Event of the mark, the lookup is limited to the '
+                                                          'event partition'),
         'score': fields.Integer(required=True, description='Score of the solution in this criteria'),
-        'comment': NullableString(description='Comment on the score')
+        'comment': NullableString(description='Comment on the score'),
+        'version': NullableInteger(description='Version of the mark the change is based on, the change is rejected '
+                                               'if the mark was changed since then')
+    })
+
+    pairing_mark_batch_item_in = api.model('pairing_mark_batch_item_in', {
+        'pairing_mark_id': fields.Integer(required=True, description='Pairing mark unique identifier'),
+        'score': fields.Integer(required=True, description='Score of the solution in this criteria'),
+        'comment': NullableString(description='Comment on the score'),
+        'version': NullableInteger(description='Version of the mark the change is based on, the change is rejected '
+                                               'if the mark was changed since then')
+    })
+
+    pairing_mark_batch_in = api.model('pairing_mark_batch_in', {
+        'event_id': fields.Integer(required=True, description='Event of all the marks, the lookup is limited to '
+                                                          'the event partition'),
+        'marks': fields.List(fields.Nested(pairing_mark_batch_item_in), required=True,
+                             description='List of marks to update')
     })
 
     pairing_mark_start_in = api.model('pairing_mark_start_in', {
@@ -459,6 +569,8 @@ class PairingMarkDto:
         'staff_id': fields.Integer(required=True, description='Staff unique identifier'),
         'score': fields.Integer(required=True, description='Score of the solution in this criteria'),
         'comment': NullableString(description='Comment on the score'),
+        'swiss_round': NullableInteger(description='Swiss round the pair belongs to'),
+        'version': fields.Integer(required=True, description='Version of the mark, grows with every change'),
         'create_date': fields.DateTime(required=True, description='Event create date'),
         'update_date': fields.DateTime(required=True, description='Last update date'),
         'last_change_by_id': fields.Integer(required=True, description='Person identifier who changed the last time')
@@ -470,6 +582,47 @@ class PairingMarkDto:
                                                    description='List of automatically updated marks')
     })
 
+    pairing_standing_out = api.model('pairing_standing_out', {
+        'event_id': fields.Integer(required=True, description='Event unique identifier'),
+        'criteria_id': fields.Integer(required=True, description='Criteria unique identifier'),
+        'solution_id': fields.Integer(required=True, description='Solution unique identifier'),
+        'wins': fields.Integer(required=True, description='Amount of judgments the solution won'),
+        'draws': fields.Integer(required=True, description='Amount of judgments the solution drew'),
+        'losses': fields.Integer(required=True, description='Amount of judgments the solution lost'),
+        'byes': fields.Integer(required=True, description='Amount of swiss rounds the solution sat out, '
+                                                          'each of them counts as a win'),
+        'update_date': fields.DateTime(required=True, description='Last update date')
+    })
+
+    pairing_standing_list = api.model('pairing_standing_list', {
+        'event_id': fields.Integer(required=True, description='Event unique identifier'),
+        'standings': fields.List(fields.Nested(pairing_standing_out), required=True,
+                                 description='Standings of the event solutions per criteria')
+    })
+
+    pairing_conflict_out = api.model('pairing_conflict_out', {
+        'pairing_mark_id': fields.Integer(required=True, description='Mark with the contradicting judgment'),
+        'staff_id': fields.Integer(required=True, description='Judge unique identifier'),
+        'criteria_id': fields.Integer(required=True, description='Criteria unique identifier'),
+        'first_solution_id': fields.Integer(required=True, description='First solution of the judged pair'),
+        'second_solution_id': fields.Integer(required=True, description='Second solution of the judged pair'),
+        'score': fields.Integer(required=True, description='Contradicting score'),
+        'witness_solution_id': NullableInteger(description='Solution closing the cycle with the judged pair, '
+                                                           'null if the pair was judged the other way before')
+    })
+
+    pairing_conflict_list = api.model('pairing_conflict_list', {
+        'event_id': fields.Integer(required=True, description='Event unique identifier'),
+        'conflicts': fields.List(fields.Nested(pairing_conflict_out), required=True,
+                                 description='Judgments contradicting earlier judgments of the same judge')
+    })
+
+    pairing_batch_update_out = api.model('batch_update_out', {
+        'updated_marks': fields.List(fields.Nested(pairing_mark_out), description='List of updated marks'),
+        'automatically_updated_marks': fields.List(fields.Nested(pairing_mark_out),
+                                                   description='List of automatically updated marks')
+    })
+
 
 class SolutionDto:
     api = Namespace('solution', description='Solution operations')
@@ -487,6 +640,16 @@ class SolutionDto:
     })
 
 
+    solution_score_aggregate_out = api.model('solution_score_aggregate_out', {
+        'criteria_id': fields.Integer(required=True, description='Criteria unique identifier'),
+        'weight': fields.Float(required=True, description='Weight of the criteria in the weighted total'),
+        'count': fields.Integer(required=True, description='Amount of marks'),
+        'mean': fields.Float(required=True, description='Mean score'),
+        'median': fields.Float(required=True, description='Median score'),
+        'minimum': fields.Float(required=True, description='Minimum score'),
+        'maximum': fields.Float(required=True, description='Maximum score')
+    })
+
     solution_out = api.model('solution_out', {
         'solution_id': fields.Integer(required=True, description='Solution unique identifier'),
         'user_id': fields.Integer(required=True, description='User unique identifier (whose solution is)'),
@@ -494,6 +657,9 @@ class SolutionDto:
         'url': fields.String(required=True, description='Link to solution'),
         'description': NullableString(description='Solution description'),
         'marks': fields.List(fields.Nested(MarkDto.mark_out), description='List of marks for solution'),
+        'score_aggregates': fields.List(fields.Nested(solution_score_aggregate_out),
+                                        description='Scores of the solution aggregated per criteria'),
+        'weighted_total': fields.Float(description='Sum of criteria mean scores multiplied by criteria weights'),
         'create_date': fields.DateTime(required=True, description='Event create date'),
         'update_date': fields.DateTime(required=True, description='Last update date'),
         'last_change_by_id': fields.Integer(required=True, description='Person identifier who changed the last time')
@@ -503,3 +669,18 @@ class SolutionDto:
         'solutions': fields.List(fields.Nested(solution_out)),
         'count': fields.Integer(required=True, description='Amount of solutions')
     })
+
+    solution_rating_out = api.model('solution_rating_out', {
+        'event_id': fields.Integer(required=True, description='Event unique identifier'),
+        'criteria_id': fields.Integer(required=True, description='Criteria unique identifier'),
+        'solution_id': fields.Integer(required=True, description='Solution unique identifier'),
+        'rating': fields.Float(required=True, description='Elo rating of the solution on the criteria'),
+        'games': fields.Integer(required=True, description='Amount of judgments the rating is based on'),
+        'update_date': fields.DateTime(required=True, description='Last update date')
+    })
+
+    solution_rating_list = api.model('solution_rating_list', {
+        'event_id': fields.Integer(required=True, description='Event unique identifier'),
+        'ratings': fields.List(fields.Nested(solution_rating_out), required=True,
+                               description='Ratings of the event solutions per criteria, best first')
+    })
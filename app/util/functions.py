@@ -1,11 +1,57 @@
+import threading
+
+from collections import OrderedDict
 from http import HTTPStatus
 
 
+class Conflict(str):
+    """
+    Error message of a change rejected because the item was changed by someone else meanwhile.
+    """
+
+
+class LruCache:
+    """
+    Mapping keeping only the `size` most recently used items, the least recently used one is evicted first.
+    Shared by request threads and job threads, so every access holds the lock.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.items))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.items:
+                return default
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def pop(self, key, default=None):
+        with self.lock:
+            return self.items.pop(key, default)
+
+
 def handle_error(result, api=None, error_code=HTTPStatus.BAD_REQUEST, error_message='Wrong parameters'):
     # TODO: rewrite with python 3.10 pattern matching
-    if isinstance(result, tuple) and len(result) == 2 and not result[0] and type(result[1]) == str:
+    if isinstance(result, tuple) and len(result) == 2 and not result[0] and isinstance(result[1], str):
         if api:
-            api.abort(error_code, result[1])
+            api.abort(HTTPStatus.CONFLICT if isinstance(result[1], Conflict) else error_code, result[1])
         return result[0]
     elif not result and api:
         api.abort(error_code, error_message)
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+
+def run_job(job_id):
+    from app.model.entity.job import Job
+
+    Job.run(job_id)
+
+
+def _run_in_app_context(app, job_id):
+    with app.app_context():
+        run_job(job_id)
+
+
+def make_celery(app):
+    from celery import Celery
+
+    celery = Celery(app.import_name, broker=app.config['CELERY_BROKER_URL'])
+
+    class ContextTask(celery.Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+
+    celery.Task = ContextTask
+    celery.task(name='run_job', ignore_result=True)(run_job)
+    return celery
+
+
+def submit_job(job_id):
+    """
+    Runs the job on celery workers when the celery backend is configured, otherwise on the in-process pool.
+    """
+    app = current_app._get_current_object()
+    if 'celery' in app.extensions:
+        app.extensions['celery'].send_task('run_job', args=[job_id])
+    else:
+        app.extensions['job_executor'].submit(_run_in_app_context, app, job_id)
+
+
+def init_app(app):
+    if app.config['JOB_BACKEND'] == 'celery':
+        app.extensions['celery'] = make_celery(app)
+    else:
+        app.extensions['job_executor'] = ThreadPoolExecutor(max_workers=app.config['JOB_WORKERS'],
+                                                            thread_name_prefix='job')
@@ -0,0 +1,134 @@
+class OrderingGraph:
+    """
+    Partial order of solutions built from one judge's pairwise marks on one criteria.
+
+    Tied solutions share a class, strict judgments are kept as a transitively closed
+    relation between classes, so every comparison implied by a new judgment is found
+    by walking only the classes above and below the judged pair.
+    Scores follow pairing mark semantics: 2 - first is better, 1 - equal, 0 - second is better.
+    Judgments contradicting the known order are kept in conflicts as (first, second, score, witness)
+    tuples, where the witness solution closes the cycle with the judged pair, or is None if the pair
+    itself was judged the other way.
+    """
+
+    def __init__(self):
+        self.classes = {}
+        self.members = {}
+        self.better = {}
+        self.worse = {}
+        self.conflicts = []
+
+    @classmethod
+    def from_marks(cls, marks):
+        graph = cls()
+        for first_solution_id, second_solution_id, score in marks:
+            graph.add(first_solution_id, second_solution_id, score)
+        return graph
+
+    def _class_of(self, solution_id):
+        if solution_id not in self.classes:
+            self.classes[solution_id] = solution_id
+            self.members[solution_id] = {solution_id}
+            self.better[solution_id] = set()
+            self.worse[solution_id] = set()
+        return self.classes[solution_id]
+
+    def relation(self, first_solution_id, second_solution_id):
+        first_class = self._class_of(first_solution_id)
+        second_class = self._class_of(second_solution_id)
+        if first_class == second_class:
+            return 1
+        if second_class in self.worse[first_class]:
+            return 2
+        if first_class in self.worse[second_class]:
+            return 0
+        return None
+
+    def add(self, first_solution_id, second_solution_id, score):
+        """
+        Adds a judgment and returns comparisons it implies as (first, second, score) tuples.
+        Judgments that are already known or contradict the current order imply nothing.
+        """
+        judged = (first_solution_id, second_solution_id, score)
+        if score == 0:
+            first_solution_id, second_solution_id = second_solution_id, first_solution_id
+        relation = self.relation(first_solution_id, second_solution_id)
+        if relation is not None:
+            if relation != (1 if score == 1 else 2):
+                self.conflicts.append(judged + (self._witness(first_solution_id, second_solution_id, relation),))
+            return []
+        first_class = self.classes[first_solution_id]
+        second_class = self.classes[second_solution_id]
+        if score == 1:
+            implied = self._merge(first_class, second_class)
+        else:
+            implied = self._link(self.better[first_class] | {first_class}, self.worse[second_class] | {second_class})
+        judged = {(first_solution_id, second_solution_id), (second_solution_id, first_solution_id)}
+        return [pair for pair in implied if pair[:2] not in judged]
+
+    def _witness(self, first_solution_id, second_solution_id, relation):
+        """
+        Finds a solution the known relation between the pair goes through, looking only at classes around the pair.
+        """
+        first_class = self.classes[first_solution_id]
+        second_class = self.classes[second_solution_id]
+        if relation == 1:
+            candidates = self.members[first_class] - {first_solution_id, second_solution_id}
+        else:
+            if relation == 0:
+                first_class, second_class = second_class, first_class
+            candidates = set()
+            for middle in self.worse[first_class] & self.better[second_class]:
+                candidates |= self.members[middle]
+        return min(candidates, default=None)
+
+    def _link(self, upper_classes, lower_classes):
+        implied = []
+        for upper in upper_classes:
+            new_lower = lower_classes - self.worse[upper]
+            if not new_lower:
+                continue
+            self.worse[upper] |= new_lower
+            for lower in new_lower:
+                self.better[lower].add(upper)
+                implied.extend((first, second, 2) for first in self.members[upper] for second in self.members[lower])
+        return implied
+
+    def _merge(self, first_class, second_class):
+        implied = [(first, second, 1) for first in self.members[first_class] for second in self.members[second_class]]
+        upper_classes = self.better[first_class] | self.better[second_class]
+        lower_classes = self.worse[first_class] | self.worse[second_class]
+        implied.extend(self._link(upper_classes, {first_class, second_class}))
+        implied.extend(self._link({first_class, second_class}, lower_classes))
+        implied.extend(self._link(upper_classes, lower_classes))
+
+        for solution_id in self.members[second_class]:
+            self.classes[solution_id] = first_class
+        self.members[first_class] |= self.members.pop(second_class)
+        for upper in self.better.pop(second_class):
+            self.worse[upper].discard(second_class)
+        for lower in self.worse.pop(second_class):
+            self.better[lower].discard(second_class)
+        return implied
+
+    def next_insertion_pair(self, solution_ids):
+        """
+        Replays binary insertion sort of solution_ids over the known order and returns
+        the first pair whose relation is still unknown, or None if the ranking is complete.
+        """
+        chain = []
+        for solution_id in solution_ids:
+            low, high = 0, len(chain)
+            while low < high:
+                middle = (low + high) // 2
+                relation = self.relation(solution_id, chain[middle])
+                if relation is None:
+                    return solution_id, chain[middle]
+                if relation == 1:
+                    low = high = middle
+                elif relation == 2:
+                    high = middle
+                else:
+                    low = middle + 1
+            chain.insert(low, solution_id)
+        return None
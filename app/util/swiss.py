@@ -0,0 +1,62 @@
+import itertools
+
+
+def swiss_pairs(points, played, byes=None):
+    """
+    Pairs solutions with close points for the next Swiss round.
+    points maps solution ids to their points, played holds (low, high) pairs that already met and byes maps
+    solution ids to the amount of rounds they sat out. Every solution takes the closest unpaired one below it
+    that it has not met yet and the ones left without an opponent swap partners with formed pairs where they can.
+    Pairs never repeat, a solution that met everyone available is left without a game. With an odd number
+    of solutions the lowest ranked one among those with the fewest byes sits the round out.
+    Returns the pairs and the solution getting the bye or None.
+    """
+    byes = byes or {}
+    ranked = sorted(points, key=lambda solution_id: (-points[solution_id], solution_id))
+    bye = None
+    if len(ranked) % 2:
+        bye = min(reversed(ranked), key=lambda solution_id: byes.get(solution_id, 0))
+        ranked.remove(bye)
+
+    paired = set()
+    pairs = []
+    for position, solution_id in enumerate(ranked):
+        if solution_id in paired:
+            continue
+        for candidate in itertools.islice(ranked, position + 1, None):
+            pair = _key(solution_id, candidate)
+            if candidate not in paired and pair not in played:
+                paired.update(pair)
+                pairs.append(pair)
+                break
+    return _repair_pairs(ranked, paired, pairs, played), bye
+
+
+def _key(first, second):
+    return min(first, second), max(first, second)
+
+
+def _find_swap(unpaired, pairs, played):
+    for first, second in itertools.combinations(unpaired, 2):
+        for index, (low, high) in enumerate(pairs):
+            for a, b in ((low, high), (high, low)):
+                if _key(first, a) not in played and _key(second, b) not in played:
+                    return first, second, index, a, b
+    return None
+
+
+def _repair_pairs(ranked, paired, pairs, played):
+    """
+    Gives games to solutions the greedy pass left without an opponent by swapping partners with a formed pair:
+    unpaired u, v and a pair (a, b) become (u, a), (v, b) when neither of them met before.
+    """
+    unpaired = [solution_id for solution_id in ranked if solution_id not in paired]
+    swap = _find_swap(unpaired, pairs, played)
+    while swap is not None:
+        first, second, index, a, b = swap
+        pairs[index] = _key(first, a)
+        pairs.append(_key(second, b))
+        unpaired.remove(first)
+        unpaired.remove(second)
+        swap = _find_swap(unpaired, pairs, played)
+    return pairs
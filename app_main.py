@@ -18,6 +18,7 @@ logging.basicConfig(filename="logs/basic_log.txt",
 app = create_app(os.getenv('SERVER_ENV') or 'dev')
 jwt = JWTManager(app)
 migrate = Migrate(app, db, compare_type=True)
+celery_app = app.extensions.get('celery')
 
 
 @app.after_request
@@ -51,6 +52,55 @@ def createdb():
     db.create_all()
 
 
+@app.cli.command('rebuild-standings')
+@click.argument('event_id', required=False)
+def rebuild_standings(event_id):
+    event_ids = [int(event_id)] if event_id else [event.event_id for event in entity.Event.query]
+    for event_id in event_ids:
+        out_of_sync = entity.PairingStanding.rebuild(event_id)
+        print(f'Event {event_id}: {out_of_sync} standings rows were out of sync')
+
+
+@app.cli.command('rebuild-ratings')
+@click.argument('event_id', required=False)
+def rebuild_ratings(event_id):
+    event_ids = [int(event_id)] if event_id else [event.event_id for event in entity.Event.query]
+    for event_id in event_ids:
+        entity.SolutionRating.rebuild(event_id)
+        print(f'Event {event_id}: ratings replayed from pairing marks')
+
+
+@app.cli.command('detach-pairing-marks')
+@click.argument('event_id')
+def detach_pairing_marks(event_id):
+    archive_name = entity.PairingMark.detach_partition(int(event_id))
+    if isinstance(archive_name, tuple):
+        print(archive_name[1])
+    else:
+        print(f'Event {event_id}: pairing marks were moved to {archive_name}')
+
+
+@app.cli.command('bench-pairing')
+@click.option('--solutions', default=30, help='Amount of solutions of every benchmark event')
+@click.option('--judges', default=3, help='Amount of synthetic judges')
+@click.option('--method', 'methods', multiple=True, type=click.Choice(entity.Event.evaluation_methods),
+              help='Evaluation method to benchmark, all of them if omitted')
+@click.option('--noise', default=0.0, help='Probability of a judge answering against the ground truth')
+@click.option('--redundancy', default=1, help='How many judges judge every pair of a swiss round')
+@click.option('--seed', default=0, help='Seed of the ground truth ranking and judges answers')
+@click.option('--keep', is_flag=True, help='Keep the seeded events, solutions and judges in the database')
+def bench_pairing(solutions, judges, methods, noise, redundancy, seed, keep):
+    from app.util.bench import bench_method
+
+    columns = ['evaluation_method', 'judgments', 'all_pairs', 'implied_marks', 'queries_per_judgment',
+               'setup_queries', 'setup_seconds', 'p50_ms', 'p99_ms', 'kendall_tau']
+    print(' '.join(f'{column:>20}' for column in columns))
+    for method in methods or entity.Event.evaluation_methods:
+        result = bench_method(method, solutions, judges, noise, redundancy, seed, keep)
+        print(' '.join(f'{result[column]:>20.3f}' if isinstance(result[column], float) else f'{result[column]:>20}'
+                       for column in columns))
+
+
 @app.cli.command('generate')
 @click.argument('count')
 @click.argument('model_name')
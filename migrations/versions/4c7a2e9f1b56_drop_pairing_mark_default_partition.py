@@ -0,0 +1,38 @@
+"""drop pairing mark default partition
+
+Revision ID: 4c7a2e9f1b56
+Revises: 6b9e2c5a1f38
+Create Date: 2026-10-19 12:41:08.219374
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4c7a2e9f1b56'
+down_revision = '6b9e2c5a1f38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # partitions can not be detached concurrently while a default partition exists,
+    # marks that ended up there are moved to partitions of their events
+    op.execute('ALTER TABLE pairing_mark DETACH PARTITION pairing_mark_default')
+    op.execute('''
+        DO $$
+        DECLARE
+            partition_event_id integer;
+        BEGIN
+            FOR partition_event_id IN SELECT DISTINCT event_id FROM pairing_mark_default LOOP
+                EXECUTE format('CREATE TABLE IF NOT EXISTS pairing_mark_%s PARTITION OF pairing_mark '
+                               'FOR VALUES IN (%s)', partition_event_id, partition_event_id);
+            END LOOP;
+        END $$
+    ''')
+    op.execute('INSERT INTO pairing_mark SELECT * FROM pairing_mark_default')
+    op.execute('DROP TABLE pairing_mark_default')
+
+
+def downgrade():
+    op.execute('CREATE TABLE pairing_mark_default PARTITION OF pairing_mark DEFAULT')
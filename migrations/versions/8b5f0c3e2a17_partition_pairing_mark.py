@@ -0,0 +1,108 @@
+"""partition pairing mark by event
+
+Revision ID: 8b5f0c3e2a17
+Revises: 3d8e1a6c9f52
+Create Date: 2026-10-19 00:27:51.604112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b5f0c3e2a17'
+down_revision = '3d8e1a6c9f52'
+branch_labels = None
+depends_on = None
+
+columns = '''
+    pairing_mark_id, criteria_id, staff_id, first_solution_id, second_solution_id, score, comment, create_date,
+    update_date, last_change_by_id, event_id, low_solution_id, high_solution_id, is_reversed, reserved_until,
+    swiss_round
+'''
+
+
+def create_pairing_mark(name, event_id_nullable, postgresql_partition_by=None):
+    op.create_table(name,
+    sa.Column('pairing_mark_id', sa.Integer(), server_default=sa.text("nextval('pairing_mark_pairing_mark_id_seq')"),
+              nullable=False),
+    sa.Column('criteria_id', sa.Integer(), nullable=True),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.Column('first_solution_id', sa.Integer(), nullable=True),
+    sa.Column('second_solution_id', sa.Integer(), nullable=True),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('comment', sa.String(), nullable=True),
+    sa.Column('create_date', sa.DateTime(), nullable=True),
+    sa.Column('update_date', sa.DateTime(), nullable=True),
+    sa.Column('last_change_by_id', sa.Integer(), nullable=True),
+    sa.Column('event_id', sa.Integer(), nullable=event_id_nullable),
+    sa.Column('low_solution_id', sa.Integer(), nullable=True),
+    sa.Column('high_solution_id', sa.Integer(), nullable=True),
+    sa.Column('is_reversed', sa.Boolean(), server_default='false', nullable=True),
+    sa.Column('reserved_until', sa.DateTime(), nullable=True),
+    sa.Column('swiss_round', sa.Integer(), nullable=True),
+    postgresql_partition_by=postgresql_partition_by
+    )
+
+
+def create_constraints(primary_key):
+    op.create_primary_key('pairing_mark_pkey', 'pairing_mark', primary_key)
+    op.create_foreign_key('pairing_mark_criteria_id_fkey', 'pairing_mark', 'criteria', ['criteria_id'], ['criteria_id'])
+    op.create_foreign_key('pairing_mark_event_id_fkey', 'pairing_mark', 'Event', ['event_id'], ['event_id'])
+    op.create_foreign_key('pairing_mark_first_solution_id_fkey', 'pairing_mark', 'solution', ['first_solution_id'],
+                          ['solution_id'])
+    op.create_foreign_key('pairing_mark_second_solution_id_fkey', 'pairing_mark', 'solution', ['second_solution_id'],
+                          ['solution_id'])
+    op.create_foreign_key('pairing_mark_staff_id_fkey', 'pairing_mark', 'staff', ['staff_id'], ['id'])
+    op.create_index('uq_pairing_mark_pair', 'pairing_mark',
+                    ['event_id', 'staff_id', 'criteria_id', 'low_solution_id', 'high_solution_id'], unique=True)
+    op.create_index('idx_pairing_mark_low', 'pairing_mark', ['low_solution_id', 'staff_id', 'criteria_id'],
+                    unique=False)
+    op.create_index('idx_pairing_mark_high', 'pairing_mark', ['high_solution_id', 'staff_id', 'criteria_id'],
+                    unique=False)
+    op.create_index('idx_pairing_mark_update', 'pairing_mark', ['event_id', 'staff_id', 'criteria_id', 'update_date'],
+                    unique=False)
+    op.create_index('idx_pairing_mark_staff_event_score', 'pairing_mark', ['staff_id', 'event_id', 'score'],
+                    unique=False)
+    op.create_index('idx_pairing_mark_swiss_round', 'pairing_mark', ['event_id', 'swiss_round'], unique=False)
+
+
+def replace_pairing_mark(name):
+    op.execute(f'INSERT INTO {name} ({columns}) SELECT {columns} FROM pairing_mark')
+    op.execute('ALTER SEQUENCE pairing_mark_pairing_mark_id_seq OWNED BY NONE')
+    op.drop_table('pairing_mark')
+    op.rename_table(name, 'pairing_mark')
+    op.execute('ALTER SEQUENCE pairing_mark_pairing_mark_id_seq OWNED BY pairing_mark.pairing_mark_id')
+
+
+def upgrade():
+    # marks without an event can not be routed to a partition
+    op.execute('''
+        UPDATE pairing_mark
+        SET event_id = solution.event_id
+        FROM solution
+        WHERE pairing_mark.event_id IS NULL AND pairing_mark.first_solution_id = solution.solution_id
+    ''')
+    op.execute('DELETE FROM pairing_mark WHERE event_id IS NULL')
+
+    create_pairing_mark('pairing_mark_partitioned', False, 'LIST (event_id)')
+    op.execute('CREATE TABLE pairing_mark_default PARTITION OF pairing_mark_partitioned DEFAULT')
+    op.execute('''
+        DO $$
+        DECLARE
+            partition_event_id integer;
+        BEGIN
+            FOR partition_event_id IN SELECT event_id FROM "Event" LOOP
+                EXECUTE format('CREATE TABLE pairing_mark_%s PARTITION OF pairing_mark_partitioned FOR VALUES IN (%s)',
+                               partition_event_id, partition_event_id);
+            END LOOP;
+        END $$
+    ''')
+    replace_pairing_mark('pairing_mark_partitioned')
+    create_constraints(['pairing_mark_id', 'event_id'])
+
+
+def downgrade():
+    create_pairing_mark('pairing_mark_unpartitioned', True)
+    replace_pairing_mark('pairing_mark_unpartitioned')
+    create_constraints(['pairing_mark_id'])